@@ -0,0 +1,2 @@
+# Present so pytest puts the repo root on sys.path and tests can
+# `import scanner` without an install step.
@@ -1,5 +1,6 @@
 import sys
 import os
+import atexit
 import concurrent.futures
 import pandas as pd
 import datetime
@@ -17,38 +18,36 @@ from scanner.strategy import Strategy
 
 # === 关键修改 1：Worker 函数必须定义在类外面 (Top-level) ===
 # 这样才能被多进程 (pickle) 正确序列化
+def _worker_init():
+    """
+    进程池 initializer：每个 worker 进程只登录一次，进程退出时再登出。
+    避免每只股票一次 login/logout（300 次 TCP 握手 + 认证往返）。
+    """
+    bs.login()
+    atexit.register(bs.logout)
+
 def process_worker_task(task_args):
     """
-    独立的进程工作函数
+    独立的进程工作函数（登录已由 _worker_init 完成，本函数不再处理会话）
     """
     symbol, start_date, end_date = task_args
-    
-    # 每个进程必须有自己的登录会话
-    # 为了避免每次请求都登录，通常做法是进程初始化时登录
-    # 但为了简单稳健，这里我们在函数内处理，虽然有一点点开销，但比报错强
-    lg = bs.login()
-    # if lg.error_code != '0':
-    #     return None
-    
+
     try:
         # 使用你现有的 DataLoader (它里面可能也有 login，没关系，BaoStock 允许重复登录)
         # 注意：这里我们直接调用 get_stock_daily
         df = DataLoader.get_stock_daily(symbol, start_date, end_date)
-        
+
         if df.empty:
-            bs.logout()
             return None
-            
+
         # Analyze
-        res = Strategy.analyze_daily(df)
+        res = Strategy.analyze_daily(df, symbol=symbol)
         if res:
             res['symbol'] = symbol
-        
-        bs.logout()
+
         return res
-        
+
     except Exception as e:
-        bs.logout()
         # print(f"Error {symbol}: {e}")
         return None
 
@@ -71,6 +70,60 @@ class MainScanner:
             print("Warning: Failed to fetch stock list. Using small fallback.")
             self.stock_pool = ['sh.600519', 'sz.000858'] 
             
+    def scan_batch(self, arrs):
+        """
+        Compute-only fast path for pre-fetched data: run the Chan
+        buy-point pipeline for all symbols in one Numba-parallel kernel.
+
+        Skips multiprocessing (and its pickling) entirely — useful when
+        the OHLCV history is already cached locally and the scan is
+        compute-bound.
+
+        Args:
+            arrs: dict of symbol -> DataFrame or dict with 'high'/'low'.
+
+        Returns:
+            list of {'symbol', 'chan_buy2', 'chan_buy3'} for symbols where
+            either buy point fires.
+        """
+        from scanner.chan_core import ChanCore
+        import numpy as np
+
+        symbols = list(arrs.keys())
+        series = []
+        for sym in symbols:
+            data = arrs[sym]
+            series.append((np.asarray(data['high'], dtype=np.float64),
+                           np.asarray(data['low'], dtype=np.float64)))
+
+        buy2, buy3 = ChanCore.batch_check_buys(series)
+
+        results = []
+        for i, sym in enumerate(symbols):
+            if buy2[i] or buy3[i]:
+                results.append({'symbol': sym,
+                                'chan_buy2': bool(buy2[i]),
+                                'chan_buy3': bool(buy3[i])})
+        return results
+
+    def prefilter_panel(self, start_date: str, end_date: str) -> List[str]:
+        """
+        Whole-universe macro prefilter on one stacked panel.
+
+        Loads every symbol into a single (S, T, 6) float32 panel and runs
+        the Numba-parallel macro gate (MA20>MA60, latest RSRS beta) in one
+        kernel call. Returns the symbols worth a full per-symbol analysis
+        (MA aligned or beta positive) — typically a small fraction of the
+        pool, so the expensive pipeline only runs on survivors.
+        """
+        codes, _, panel, lengths = DataLoader.load_panel(
+            self.stock_pool, start_date, end_date)
+        if not codes:
+            return []
+        betas, ma_ok = Strategy.scan_panel(panel, lengths)
+        return [sym for i, sym in enumerate(codes)
+                if ma_ok[i] or betas[i] > 0]
+
     def run_daily_scan(self, lookback_days=700):
         print(f"Starting scan for {len(self.stock_pool)} stocks...")
         
@@ -89,26 +142,21 @@ class MainScanner:
         # 准备任务参数列表
         tasks = [(stock, start_date_str, today_str) for stock in self.stock_pool]
         
-        # 使用 ProcessPoolExecutor (多进程)
-        with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
-            # 提交任务
-            future_to_stock = {
-                executor.submit(process_worker_task, task): task[0] 
-                for task in tasks
-            }
-            
+        # 使用 ProcessPoolExecutor (多进程)，每个 worker 进程登录一次
+        # executor.map + chunksize 按批序列化任务，省掉每只股票一个 Future
+        # 对象和一次 IPC 往返
+        chunksize = max(1, len(tasks) // (max_workers * 4))
+        with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers,
+                                                    initializer=_worker_init) as executor:
             completed = 0
-            for future in concurrent.futures.as_completed(future_to_stock):
-                stock = future_to_stock[future]
+            for stock, res in zip(self.stock_pool,
+                                  executor.map(process_worker_task, tasks,
+                                               chunksize=chunksize)):
                 completed += 1
-                try:
-                    res = future.result()
-                    if res:
-                        results.append(res)
-                    print(f"[{completed}/{len(self.stock_pool)}] Found {len(results)} candidates... Processing {stock}    ", end='\r')
-                except Exception as e:
-                    print(f"Error processing {stock}: {e}")
-                    
+                if res:
+                    results.append(res)
+                print(f"[{completed}/{len(self.stock_pool)}] Found {len(results)} candidates... Processing {stock}    ", end='\r')
+
         print("\nScan complete.")
         
         if not results:
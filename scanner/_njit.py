@@ -0,0 +1,36 @@
+"""
+Optional Numba support.
+
+Numba gives big speedups on the per-bar kernels but is not a hard
+requirement — when it is missing we fall back to plain Python so the
+scanner still runs (slower) on a bare pandas/numpy install.
+
+Usage: `from ._njit import njit, prange, NUMBA_AVAILABLE`
+
+`nb_types` re-exports `numba.types` (None without numba) so kernel
+modules can build explicit signatures. Kernels fed from
+`Series.to_numpy()` must declare those inputs with
+`nb_types.Array(..., readonly=True)`: pandas copy-on-write hands out
+read-only arrays, and an eagerly compiled dispatcher with a writable
+signature refuses them outright.
+"""
+
+try:
+    from numba import njit, prange
+    from numba import types as nb_types
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    nb_types = None
+
+    def njit(*args, **kwargs):
+        # Support both @njit and @njit(...) / @njit("signature", ...)
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+
+        def wrapper(func):
+            return func
+        return wrapper
+
+    def prange(*args):
+        return range(*args)
@@ -1,55 +1,288 @@
+import os
+import time
 import pandas as pd
 import numpy as np
+from dataclasses import dataclass
 from enum import Enum
 from typing import List, Optional, Tuple
 
+from ._njit import njit, prange
+
 class BiType(Enum):
     UP = 1
     DOWN = -1
 
+
+@dataclass
+class ChanContext:
+    """
+    SoA view of one symbol's bars for the Chan kernels.
+
+    Built once per symbol (from_df) and threaded through
+    find_fractals / get_bi_list / get_last_k_bi so the high/low/date
+    arrays are extracted from pandas exactly once instead of per call.
+    """
+    highs: np.ndarray
+    lows: np.ndarray
+    dates: np.ndarray
+    types: Optional[np.ndarray] = None  # filled by find_fractals
+
+    @classmethod
+    def from_df(cls, df: pd.DataFrame) -> "ChanContext":
+        return cls(
+            highs=df['high'].to_numpy(dtype=np.float64),
+            lows=df['low'].to_numpy(dtype=np.float64),
+            dates=df['date'].to_numpy(),
+        )
+
+
+@njit('Tuple((int64[:], int64[:]))(int8[:], float64[:])', cache=True)
+def _bi_state_machine(types: np.ndarray, prices: np.ndarray):
+    """
+    Core Bi state machine over fractal arrays (compiled with Numba when available).
+
+    Args:
+        types: int8 array of fractal types (1 Top, -1 Bottom), in chronological order.
+        prices: float64 array of fractal prices (high for Tops, low for Bottoms).
+
+    Returns:
+        (start_pos, end_pos): positions into the fractal arrays for each Bi.
+    """
+    n = types.size
+    # At most n-1 bis; preallocate and slice at the end.
+    start_pos = np.empty(n, dtype=np.int64)
+    end_pos = np.empty(n, dtype=np.int64)
+    count = 0
+    last = 0  # position of the current candidate fractal
+
+    for i in range(1, n):
+        if types[i] == types[last]:
+            # Same type, keep the more extreme one (Higher Top or Lower Bottom)
+            if types[i] == 1:
+                if prices[i] > prices[last]:
+                    last = i
+            else:
+                if prices[i] < prices[last]:
+                    last = i
+        else:
+            # Different type, form a Bi
+            start_pos[count] = last
+            end_pos[count] = i
+            count += 1
+            last = i
+
+    return start_pos[:count], end_pos[:count]
+
+@njit('Tuple((boolean[:], boolean[:]))(float64[:,:], float64[:,:], int64[:])',
+      cache=True, parallel=True)
+def _batch_chan_scan(highs2d: np.ndarray, lows2d: np.ndarray, lengths: np.ndarray):
+    """
+    Fractal -> Bi -> buy-point check for many symbols at once, with the
+    symbol loop parallelized via prange (Numba threading, no pickling).
+
+    Args:
+        highs2d/lows2d: (n_symbols, max_len) padded float64 arrays.
+        lengths: valid bar count per symbol.
+
+    Returns:
+        (buy2, buy3): boolean flags per symbol, same semantics as check_buys.
+    """
+    n_sym = lengths.size
+    buy2 = np.zeros(n_sym, dtype=np.bool_)
+    buy3 = np.zeros(n_sym, dtype=np.bool_)
+
+    for s in prange(n_sym):
+        n = lengths[s]
+        if n < 3:
+            continue
+        highs = highs2d[s, :n]
+        lows = lows2d[s, :n]
+
+        # Classify fractals (bottom wins a shared bar, matching _fractal_types
+        # where the bottom mask is written last)
+        f_types = np.empty(n, dtype=np.int8)
+        f_prices = np.empty(n, dtype=np.float64)
+        nf = 0
+        for i in range(1, n - 1):
+            if lows[i] < lows[i - 1] and lows[i] < lows[i + 1]:
+                f_types[nf] = -1
+                f_prices[nf] = lows[i]
+                nf += 1
+            elif highs[i] > highs[i - 1] and highs[i] > highs[i + 1]:
+                f_types[nf] = 1
+                f_prices[nf] = highs[i]
+                nf += 1
+        if nf < 2:
+            continue
+
+        start_pos, end_pos = _bi_state_machine(f_types[:nf], f_prices[:nf])
+        nb = start_pos.size
+        if nb < 4:
+            continue
+
+        # Same checks as check_buys, on the last three bis
+        last_start = start_pos[nb - 1]
+        if f_types[last_start] == 1:  # last Bi starts at a Top -> DOWN
+            last_low = f_prices[end_pos[nb - 1]]
+            prev_low = f_prices[start_pos[nb - 2]]  # prev Bi is UP, start is Low
+            if last_low > prev_low:
+                buy2[s] = True
+            top1 = f_prices[start_pos[nb - 3]]  # prev_prev Bi is DOWN, start is High
+            if last_low > top1:
+                buy3[s] = True
+
+    return buy2, buy3
+
+
 class ChanCore:
     """
     Simplified Chan Lun implementation focusing on Fractals (Fen Xing) and Bi (Strokes).
     """
 
     @staticmethod
-    def find_fractals(df: pd.DataFrame) -> pd.DataFrame:
+    def find_fractals(df: pd.DataFrame, inplace: bool = False) -> pd.DataFrame:
         """
         Identify Top and Bottom Fractals.
         Top Fractal: High[i] > High[i-1] and High[i] > High[i+1]
         Bottom Fractal: Low[i] < Low[i-1] and Low[i] < Low[i+1]
-        
+
         Note: This is a simplified version without strict 'inclusion' (Baohan) processing.
+
+        Args:
+            df: OHLC frame.
+            inplace: When True, attach the 'type' column directly to df
+                instead of building a new frame — callers that own their
+                frame (one per symbol in the scan) should opt in to skip
+                the copy. Array dicts are always updated in place.
+        """
+        if isinstance(df, ChanContext):
+            df.types = ChanCore._fractal_types(df.highs, df.lows)
+            return df
+
+        if isinstance(df, dict):
+            # SoA form from DataLoader.get_stock_daily_np
+            df['type'] = ChanCore._fractal_types(df['high'], df['low'])
+            return df
+
+        type_arr = ChanCore._fractal_types(df['high'].to_numpy(), df['low'].to_numpy())
+        if inplace:
+            df['type'] = type_arr
+            return df
+        return df.assign(type=type_arr)
+
+    @staticmethod
+    def _fractal_types(highs: np.ndarray, lows: np.ndarray) -> np.ndarray:
+        """
+        Classify each bar as Top (1), Bottom (-1) or neither (0).
         """
-        df = df.copy()
-        df['type'] = 0  # 1: Top, -1: Bottom
-        
-        highs = df['high'].values
-        lows = df['low'].values
-        
         # Vectorized search for simple fractals (3 bars)
-        # We need at least 3 bars. 
+        # We need at least 3 bars.
         # For strict Chan Lun, we need 5 bars? Let's use 3 for sensitivity, or 5?
         # Standard: Look at 3 bars (Left, Mid, Right).
-        
+
         # Top Fractal
         is_top = (highs[1:-1] > highs[:-2]) & (highs[1:-1] > highs[2:])
         # Bottom Fractal
         is_bottom = (lows[1:-1] < lows[:-2]) & (lows[1:-1] < lows[2:])
-        
+
         # Fill types (offset by 1 because we sliced 1:-1)
         # Note: We prioritize validity. If Top and Bottom share bars, it's noise, but for now mark them.
-        
-        # We prefer to iterate to handle "shared" bars or complex patterns if needed, 
-        # but vectorized is faster.
-        
-        top_indices = np.where(is_top)[0] + 1
-        bottom_indices = np.where(is_bottom)[0] + 1
-        
-        df.iloc[top_indices, df.columns.get_loc('type')] = 1
-        df.iloc[bottom_indices, df.columns.get_loc('type')] = -1
-        
-        return df
+
+        # Assign straight into a numpy int8 buffer instead of going through
+        # the pandas .iloc indexer twice (which copies and consolidates blocks).
+        type_arr = np.zeros(len(highs), dtype=np.int8)  # 1: Top, -1: Bottom
+        type_arr[1:-1][is_top] = 1
+        type_arr[1:-1][is_bottom] = -1
+
+        return type_arr
+
+    # On-disk fractal cache for the daily scan. Keyed by symbol; the stored
+    # date array decides how much of a prior run can be reused.
+    FRACTAL_CACHE_DIR = "chan_cache"
+    FRACTAL_CACHE_TTL_DAYS = 30
+    # A bar's fractal status depends on its +-1 neighbors, so a few bars at
+    # the end of yesterday's window may flip once new bars arrive.
+    _TAIL_RECHECK = 5
+
+    @staticmethod
+    def find_fractals_incremental(df: pd.DataFrame, symbol: str,
+                                  cache_dir: str = None) -> pd.DataFrame:
+        """
+        Like find_fractals, but reuses yesterday's result from an on-disk
+        cache and re-classifies only the tail bars that can have changed.
+
+        The daily scan recomputes the full 700-bar window per symbol even
+        though at most a handful of bars are new; this turns that into an
+        O(tail) update. Falls back to the full computation on any cache
+        miss/mismatch.
+        """
+        n = len(df)
+        if not symbol or n < 3:
+            return ChanCore.find_fractals(df)
+
+        if cache_dir is None:
+            cache_dir = ChanCore.FRACTAL_CACHE_DIR
+
+        # Fixed-width unicode, not object dtype: np.savez would pickle an
+        # object array and np.load (allow_pickle=False) could never read
+        # it back, turning every scan into a cache miss.
+        dates = df['date'].astype(str).to_numpy().astype('U10')
+        cache_file = os.path.join(cache_dir, f"{symbol.replace('.', '_')}.npz")
+
+        type_arr = None
+        try:
+            if os.path.exists(cache_file):
+                cached = np.load(cache_file)
+                c_dates = cached['dates']
+                c_types = cached['types']
+                # Locate our first bar inside the cached window (the lookback
+                # window slides forward a little every day).
+                pos = np.searchsorted(c_dates, dates[0])
+                if pos < len(c_dates) and c_dates[pos] == dates[0]:
+                    overlap = min(len(c_dates) - pos, n)
+                    if overlap >= 3 and np.array_equal(c_dates[pos:pos + overlap],
+                                                       dates[:overlap]):
+                        type_arr = np.zeros(n, dtype=np.int8)
+                        type_arr[:overlap] = c_types[pos:pos + overlap]
+                        # Re-classify the tail (plus a margin of context bars)
+                        lo = max(overlap - ChanCore._TAIL_RECHECK, 0)
+                        tail_types = ChanCore._fractal_types(
+                            df['high'].to_numpy()[lo:], df['low'].to_numpy()[lo:])
+                        # Keep the boundary bars from the cached prefix
+                        type_arr[lo + 1:n - 1] = tail_types[1:-1]
+        except Exception:
+            type_arr = None  # Corrupt/old-format cache -> full rebuild
+
+        if type_arr is None:
+            type_arr = ChanCore._fractal_types(df['high'].to_numpy(),
+                                               df['low'].to_numpy())
+
+        # Persist atomically (write temp then rename) so a killed scan
+        # never leaves a truncated file behind.
+        try:
+            if not os.path.exists(cache_dir):
+                os.makedirs(cache_dir, exist_ok=True)
+            tmp_file = cache_file + ".tmp"
+            np.savez(tmp_file, dates=dates, types=type_arr)
+            # np.savez appends .npz to the name it is given
+            os.replace(tmp_file + ".npz", cache_file)
+            ChanCore._evict_stale_cache(cache_dir)
+        except Exception:
+            pass  # Caching is best-effort; never fail the scan over it
+
+        return df.assign(type=type_arr)
+
+    @staticmethod
+    def _evict_stale_cache(cache_dir: str):
+        """Drop cache entries not touched for FRACTAL_CACHE_TTL_DAYS."""
+        cutoff = time.time() - ChanCore.FRACTAL_CACHE_TTL_DAYS * 86400
+        try:
+            for name in os.listdir(cache_dir):
+                path = os.path.join(cache_dir, name)
+                if name.endswith('.npz') and os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+        except OSError:
+            pass
 
     @staticmethod
     def get_bi_list(df: pd.DataFrame) -> List[dict]:
@@ -62,56 +295,162 @@ class ChanCore:
         4. (Simplified) Ignore "number of bars in between" constraint for now, 
            or enforce min 1 bar between Top and Bottom.
         """
-        if 'type' not in df.columns:
-            df = ChanCore.find_fractals(df)
-            
-        fractals = df[df['type'] != 0].copy()
-        if fractals.empty:
+        types, prices, indices, dates = ChanCore._fractal_arrays(df)
+        if types.size == 0:
             return []
-        
+
+        start_pos, end_pos = _bi_state_machine(types, prices)
+
+        # Materialize dicts only for the final bi list
         bi_list = []
-        curr_bi = None
-        
-        # Iterate through fractals
-        # We need to find a sequence of Top -> Bottom or Bottom -> Top
-        
-        last_f = None
-        
-        for idx, row in fractals.iterrows():
-            f_type = row['type']
-            f_price = row['high'] if f_type == 1 else row['low']
-            f_date = row['date']
-            
-            if last_f is None:
-                last_f = {'index': idx, 'type': f_type, 'price': f_price, 'date': f_date}
-                continue
-            
-            # If we have a Last Fractal
-            if last_f['type'] == f_type:
-                # Same type, keep the more extreme one (Higher Top or Lower Bottom)
-                if f_type == 1: # Top
-                    if f_price > last_f['price']:
-                        last_f = {'index': idx, 'type': f_type, 'price': f_price, 'date': f_date}
-                else: # Bottom
-                    if f_price < last_f['price']:
-                        last_f = {'index': idx, 'type': f_type, 'price': f_price, 'date': f_date}
+        for k in range(len(start_pos)):
+            s = start_pos[k]
+            e = end_pos[k]
+            bi_list.append({
+                'start_index': indices[s],
+                'start_date': dates[s],
+                'start_price': prices[s],
+                'end_index': indices[e],
+                'end_date': dates[e],
+                'end_price': prices[e],
+                'type': BiType.DOWN if types[s] == 1 else BiType.UP
+            })
+
+        return bi_list
+
+    @staticmethod
+    def _fractal_arrays(df) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Gather the fractal rows of a frame (or SoA dict) as raw arrays:
+        (types, prices, indices, dates). Runs find_fractals first if the
+        'type' column is missing.
+        """
+        if isinstance(df, ChanContext):
+            if df.types is None:
+                ChanCore.find_fractals(df)
+            type_all = df.types
+            high_all = df.highs
+            low_all = df.lows
+            date_all = df.dates
+            index_all = np.arange(type_all.size)
+        elif isinstance(df, dict):
+            # SoA form: arrays are already materialized
+            if 'type' not in df:
+                df = ChanCore.find_fractals(df)
+            type_all = df['type']
+            high_all = np.asarray(df['high'], dtype=np.float64)
+            low_all = np.asarray(df['low'], dtype=np.float64)
+            date_all = df['date']
+            index_all = np.arange(type_all.size)
+        else:
+            if 'type' not in df.columns:
+                df = ChanCore.find_fractals(df)
+            type_all = df['type'].to_numpy()
+            high_all = df['high'].to_numpy(dtype=np.float64)
+            low_all = df['low'].to_numpy(dtype=np.float64)
+            date_all = df['date'].to_numpy()
+            index_all = df.index.to_numpy()
+
+        # Gather fractal rows with a boolean mask on raw arrays — a pandas
+        # df[df['type'] != 0] filter would rebuild a frame (index + all
+        # columns) just to throw most of it away.
+        idx_arr = np.nonzero(type_all != 0)[0]
+        if idx_arr.size == 0:
+            empty = np.empty(0)
+            return empty.astype(np.int8), empty, empty, empty
+
+        types = type_all[idx_arr].astype(np.int8)
+        highs = high_all[idx_arr]
+        lows = low_all[idx_arr]
+        prices = np.where(types == 1, highs, lows)
+        indices = index_all[idx_arr]
+        dates = date_all[idx_arr]
+        return types, prices, indices, dates
+
+    @staticmethod
+    def get_last_k_bi(df, k: int = 3) -> List[dict]:
+        """
+        Last k Bi only, found by scanning the fractals backward and
+        stopping as soon as k bis are complete.
+
+        The scanner only ever inspects the most recent structure
+        (check_buys reads three bis), so walking the whole history through
+        the state machine is wasted work: this is O(tail fractals) instead
+        of O(all fractals). Matches the forward state machine exactly: a
+        Bi starts at a run's extreme and ends at the *first* fractal of
+        the following run (which is where _bi_state_machine emits), so the
+        result equals get_bi_list(df)[-k:].
+        """
+        types, prices, indices, dates = ChanCore._fractal_arrays(df)
+        n = types.size
+        if n < 2:
+            return []
+
+        # Collect (extreme_pos, first_pos) of each same-type run, newest
+        # run first. k bis need k+1 runs.
+        runs = []
+        ext = n - 1
+        first = n - 1
+        for i in range(n - 2, -1, -1):
+            if types[i] == types[ext]:
+                # Same type: this bar is now the run's chronological first;
+                # keep the more extreme one as the run extreme
+                first = i
+                if (types[i] == 1 and prices[i] > prices[ext]) or \
+                   (types[i] == -1 and prices[i] < prices[ext]):
+                    ext = i
             else:
-                # Different type, form a Bi
-                # Check validity (e.g. price difference validation? not strictly needed for raw Bi)
-                bi = {
-                    'start_index': last_f['index'],
-                    'start_date': last_f['date'],
-                    'start_price': last_f['price'],
-                    'end_index': idx,
-                    'end_date': f_date,
-                    'end_price': f_price,
-                    'type': BiType.DOWN if last_f['type'] == 1 else BiType.UP
-                }
-                bi_list.append(bi)
-                last_f = {'index': idx, 'type': f_type, 'price': f_price, 'date': f_date}
-                
+                runs.append((ext, first))
+                if len(runs) == k + 1:
+                    break
+                ext = i
+                first = i
+        else:
+            runs.append((ext, first))
+
+        runs.reverse()  # chronological order
+
+        bi_list = []
+        for j in range(len(runs) - 1):
+            s = runs[j][0]       # extreme of this run
+            e = runs[j + 1][1]   # first fractal of the next run
+            bi_list.append({
+                'start_index': indices[s],
+                'start_date': dates[s],
+                'start_price': prices[s],
+                'end_index': indices[e],
+                'end_date': dates[e],
+                'end_price': prices[e],
+                'type': BiType.DOWN if types[s] == 1 else BiType.UP
+            })
         return bi_list
 
+    @staticmethod
+    def batch_check_buys(series: List[Tuple[np.ndarray, np.ndarray]]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Run the fractal/Bi/buy-point pipeline over many symbols in one
+        parallel kernel call.
+
+        Args:
+            series: list of (highs, lows) float arrays, one pair per symbol.
+
+        Returns:
+            (buy2, buy3): boolean arrays aligned with the input order.
+        """
+        n_sym = len(series)
+        if n_sym == 0:
+            return np.zeros(0, dtype=bool), np.zeros(0, dtype=bool)
+
+        lengths = np.array([len(h) for h, _ in series], dtype=np.int64)
+        max_len = int(lengths.max())
+        highs2d = np.zeros((n_sym, max_len), dtype=np.float64)
+        lows2d = np.zeros((n_sym, max_len), dtype=np.float64)
+        for i, (h, l) in enumerate(series):
+            highs2d[i, :len(h)] = h
+            lows2d[i, :len(l)] = l
+
+        return _batch_chan_scan(highs2d, lows2d, lengths)
+
     @staticmethod
     def check_buys(bi_list: List[dict], current_price: float) -> dict:
         """
@@ -135,48 +474,40 @@ class ChanCore:
         
         # 1. First Buy (Trend Reversal logic - Simplified)
         # Usually requires divergence. We'll leave strict 1-Buy to MACD combination in Strategy.
-        # But chart-wise: A sharp Down Bi followed by a failure to continue down? 
+        # But chart-wise: A sharp Down Bi followed by a failure to continue down?
         # Hard to judge 1st buy solely on Bi without divergence.
-        
-        # 2. Second Buy (Pullback logic)
-        # Situation: Up Bi (prev), then Down Bi (last).
-        # Logic: Last Down Bi's Low > Previous Low (from where Up Bi started).
-        # Structure: ... -> Down(pp) -> Up(p) -> Down(last)
-        if last_bi['type'] == BiType.DOWN:
+
+        # Buy 2 and Buy 3 both require the last Bi to be a Down Bi, so test
+        # it once (identity check — enum members are singletons).
+        if last_bi['type'] is BiType.DOWN:
             # The low of the last Down Bi
             last_low = last_bi['end_price']
-            # The low of the previous Down Bi (start of the Up Bi)
+
+            # 2. Second Buy (Pullback logic)
+            # Situation: Up Bi (prev), then Down Bi (last).
+            # Logic: Last Down Bi's Low > Previous Low (from where Up Bi started).
+            # Structure: ... -> Down(pp) -> Up(p) -> Down(last)
             prev_low = prev_bi['start_price'] # prev_bi is UP, so start is Low
-            
+
             if last_low > prev_low:
                 # Potential 2nd Buy
                 res['buy2'] = True
                 res['desc'] += f"Buy 2: Higher Low formed ({last_low} > {prev_low}). "
 
-        # 3. Third Buy (Trend Continuation/Breakout logic)
-        # Situation: Large Up Trend, consolidation (Zoo), then Breakout, then Pullback not entering Zoo.
-        # Simplified: Up -> Down (High Low) -> Up (Break High) -> Down (Stay above High)
-        # This needs more history. Let's look at relative strength.
-        # If Last Bi is DOWN, and its Low is significantly higher than previous Pivot High.
-        
-        if last_bi['type'] == BiType.DOWN:
-             # prev_bi is UP. prev_bi start is Low, end is High.
-             # prev_prev_bi is DOWN. 
-             
-             # Pivot High: prev_bi['end_price']
-             # Pivot Low: prev_bi['start_price']
-             
-             # Actually for 3rd Buy, we typically compare with a "Center" (ZhongShu).
-             # Simplified: If Last Low > The High of the 'prev_prev_bi' (The peak before the valley)
-             # Structure: Top1 -> Low1 -> Top2 -> Low2. 
-             # If Low2 > Top1, it's very strong. (Gap up-ish structure).
-             
-             # prev_prev_bi is DOWN. Its start is a High (Top1).
-             top1 = prev_prev_bi['start_price']
-             last_low = last_bi['end_price']
-             
-             if last_low > top1:
-                 res['buy3'] = True
-                 res['desc'] += f"Buy 3: Strong Trend (Low {last_low} > Prev High {top1}). "
+            # 3. Third Buy (Trend Continuation/Breakout logic)
+            # Situation: Large Up Trend, consolidation (Zoo), then Breakout, then Pullback not entering Zoo.
+            # Simplified: Up -> Down (High Low) -> Up (Break High) -> Down (Stay above High)
+            #
+            # Actually for 3rd Buy, we typically compare with a "Center" (ZhongShu).
+            # Simplified: If Last Low > The High of the 'prev_prev_bi' (The peak before the valley)
+            # Structure: Top1 -> Low1 -> Top2 -> Low2.
+            # If Low2 > Top1, it's very strong. (Gap up-ish structure).
+
+            # prev_prev_bi is DOWN. Its start is a High (Top1).
+            top1 = prev_prev_bi['start_price']
+
+            if last_low > top1:
+                res['buy3'] = True
+                res['desc'] += f"Buy 3: Strong Trend (Low {last_low} > Prev High {top1}). "
 
         return res
@@ -35,8 +35,11 @@ class ChipCore:
         # But we need to be careful.
         # Let's assume input 'turnover' is in percentage, so divide by 100.
         
-        turnover = df['turnover'].values / 100.0 * decay_factor
-        prices = df['close'].values # Use Close approximation
+        # float32 throughout: prices carry 2-3 significant decimals and the
+        # weights are ratios, so single precision is plenty — and it halves
+        # the bandwidth of every pass below.
+        turnover = df['turnover'].to_numpy(dtype=np.float32) * np.float32(decay_factor / 100.0)
+        prices = df['close'].to_numpy(dtype=np.float32) # Use Close approximation
         
         # We model the chip distribution as a list of buckets or just arrays of (Price, Weight)
         # But iterating day by day and updating weights is better.
@@ -70,18 +73,20 @@ class ChipCore:
         retention = 1.0 - recent_turnover
         # Clip to [0, 1] to avoid errors
         retention = np.clip(retention, 0.0, 1.0)
-        
+
         # Cumulative Retention from end to start (reverse cumprod)
-        # cum_retention[k] = product(retention[k:]) -- wait
         # Weight[i] = Turnover[i] * Product(Retention[i+1:])
-        
-        # Let's compute suffix products
-        suffix_prod = np.cumprod(retention[::-1])[::-1]
-        # Shift suffix_prod to align: suffix for i starts at i+1
-        # suffix_prod[i] includes retention[i], we want retention[i+1]...
-        
-        valid_weights = np.zeros(history_len)
-        valid_weights[:-1] = recent_turnover[:-1] * suffix_prod[1:]
+
+        # Compute suffix products in log space: a direct cumprod underflows
+        # to exactly 0 once a few days have turnover near 100%, wiping out
+        # the weights of everything older. log + cumsum + exp keeps the tiny
+        # weights representable.
+        log_ret = np.log(np.clip(retention, 1e-12, 1.0))
+        suffix_log = np.cumsum(log_ret[::-1])[::-1]
+        # suffix_log[i] includes retention[i], we want retention[i+1]...
+
+        valid_weights = np.zeros(history_len, dtype=np.float32)
+        valid_weights[:-1] = recent_turnover[:-1] * np.exp(suffix_log[1:])
         valid_weights[-1] = recent_turnover[-1] # The last day
         
         # Normalize weights to sum to 1 (handling initial condition or truncation)
@@ -99,32 +104,24 @@ class ChipCore:
         # Average Cost
         avg_cost = np.sum(recent_prices * valid_weights)
         
-        # Concentration (90%)
-        # Sort by price
-        sorted_indices = np.argsort(recent_prices)
-        sorted_prices = recent_prices[sorted_indices]
-        sorted_weights = valid_weights[sorted_indices]
-        
-        cum_weights = np.cumsum(sorted_weights)
-        
-        # Find price at 5% and 95%
-        p05_idx = np.searchsorted(cum_weights, 0.05)
-        p95_idx = np.searchsorted(cum_weights, 0.95)
-        
-        # Clamp indices
-        p05_idx = min(p05_idx, len(sorted_prices)-1)
-        p95_idx = min(p95_idx, len(sorted_prices)-1)
-        
-        p05 = sorted_prices[p05_idx]
-        p95 = sorted_prices[p95_idx]
-        
+        # Concentration (90%), one compact block: sort once, interpolate the
+        # 5%/95% weight levels off the cumulative curve, fuse the width
+        # formula. The sorted temporaries go out of scope right away instead
+        # of lingering next to the per-day arrays.
+        order = np.argsort(recent_prices)
+        prices_sorted = recent_prices[order]
+        cum = np.cumsum(valid_weights[order])
+        p05 = np.interp(0.05, cum, prices_sorted)
+        p95 = np.interp(0.95, cum, prices_sorted)
         concentration = (p95 - p05) / (p05 + p95) * 2 # Standard formula might vary
         # Or simply (p95 - p05) / avg_cost
-        
+        del order, prices_sorted, cum
+
+        # Scalars go back out as plain float64 for callers
         return {
-            'profit_ratio': profit_ratio,
-            'avg_cost': avg_cost,
-            'concentration': concentration,
-            'cost95': p95,
-            'cost05': p05
+            'profit_ratio': float(profit_ratio),
+            'avg_cost': float(avg_cost),
+            'concentration': float(concentration),
+            'cost95': float(p95),
+            'cost05': float(p05)
         }
@@ -1,21 +1,35 @@
 import baostock as bs
 import pandas as pd
+import numpy as np
 import datetime
 import os
 import threading
-from typing import List, Optional
+import concurrent.futures
+from typing import Dict, List, Optional
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.feather as pa_feather
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
 
 class DataLoader:
     """
     Data Loader utilizing BaoStock for A-share market data.
     Features:
     - Global Login/Logout
-    - Local CSV Caching
+    - Local Parquet/Feather Caching (legacy CSV entries migrated on read)
     - High Concurrency Support
     """
     _login_lock = threading.Lock()
     _is_logged_in = False
     CACHE_DIR = "data_cache"
+    # 'parquet' (compressed, smaller on disk) or 'feather' (uncompressed
+    # Arrow IPC, read zero-copy through an mmap so concurrent scanner
+    # processes share one OS page cache instead of each decompressing)
+    CACHE_FORMAT = "parquet"
 
     @classmethod
     def initialize(cls):
@@ -32,6 +46,20 @@ class DataLoader:
                 else:
                     print(f"BaoStock login failed: {lg.error_msg}")
 
+    @classmethod
+    def ensure_session(cls):
+        """
+        Make sure this process holds a live BaoStock session, logging in
+        lazily on first use.
+
+        BaoStock speaks its own TCP protocol with one persistent connection
+        per login, so "connection pooling" here means: log in once per
+        process and reuse that socket for every subsequent query, instead
+        of paying the handshake per symbol. Thread-safe via _login_lock.
+        """
+        if not cls._is_logged_in:
+            cls.initialize()
+
     @classmethod
     def logout(cls):
         """Global logout."""
@@ -52,23 +80,55 @@ class DataLoader:
         Returns:
             pd.DataFrame
         """
-        # Normalize symbol for filename (e.g. sh.600000 -> sh_600000.csv)
-        file_symbol = symbol.replace('.', '_')
-        cache_file = os.path.join(DataLoader.CACHE_DIR, f"{file_symbol}.csv")
-        
-        # 1. Try Cache
-        if os.path.exists(cache_file):
+        # Normalize symbol for filename (e.g. sh.600000 -> sh_600000.parquet)
+        cache_file = DataLoader._cache_path(DataLoader.CACHE_DIR, symbol)
+        legacy_csv = os.path.join(DataLoader.CACHE_DIR,
+                                  f"{symbol.replace('.', '_')}.csv")
+
+        if len(end_date) == 8:
+            end_date = f"{end_date[:4]}-{end_date[4:6]}-{end_date[6:]}"
+
+        # 1. Try Cache (columnar, typed — no text parsing and no re-running
+        # pd.to_numeric/to_datetime on every read). A hit is topped up with
+        # just the rows after the last cached date rather than re-downloading
+        # the history.
+        if cache_file is not None:
+            try:
+                df = DataLoader._read_cache(cache_file)
+                if not df.empty:
+                    return DataLoader._refresh_tail(df, symbol, end_date, adjust, cache_file)
+            except Exception as e:
+                print(f"Error reading cache for {symbol}: {e}")
+        elif os.path.exists(legacy_csv):
+            # Migrate an old CSV cache entry to the columnar format on first touch
+            cache_file = DataLoader._cache_path(DataLoader.CACHE_DIR, symbol,
+                                                existing=False)
             try:
-                # We assume cache contains enough data or use it as is.
-                # Ideally check last date, but for simplicity read all.
-                df = pd.read_csv(cache_file)
-                df['date'] = pd.to_datetime(df['date']).dt.date
-                # Filter by date range? Optional, mostly we want everything ending today.
-                return df
+                df = DataLoader._read_legacy_csv(legacy_csv)
+                DataLoader._write_cache_atomic(df, cache_file)
+                if not df.empty:
+                    return DataLoader._refresh_tail(df, symbol, end_date, adjust, cache_file)
             except Exception as e:
                 print(f"Error reading cache for {symbol}: {e}")
 
+        if cache_file is None:
+            cache_file = DataLoader._cache_path(DataLoader.CACHE_DIR, symbol,
+                                                existing=False)
+
         # 2. Download from BaoStock
+        df = DataLoader._download_daily(symbol, start_date, end_date, adjust)
+
+        # 3. Save to Cache
+        if not df.empty:
+            DataLoader._write_cache_atomic(df, cache_file)
+
+        return df
+
+    @staticmethod
+    def _download_daily(symbol: str, start_date: str, end_date: str, adjust: str = "2") -> pd.DataFrame:
+        """
+        Fetch daily bars from BaoStock (no caching), with types converted.
+        """
         # BaoStock requires 'YYYY-MM-DD' format.
         # Input might be 'YYYYMMDD', convert if needed.
         if len(start_date) == 8:
@@ -77,6 +137,9 @@ class DataLoader:
             end_date = f"{end_date[:4]}-{end_date[4:6]}-{end_date[6:]}"
 
         try:
+            # Reuse the process-wide session (one socket per process)
+            DataLoader.ensure_session()
+
             # fields: date,code,open,high,low,close,preclose,volume,amount,adjustflag,turn,tradestatus,pctChg,isST
             rs = bs.query_history_k_data_plus(
                 symbol,
@@ -84,37 +147,318 @@ class DataLoader:
                 start_date=start_date, end_date=end_date,
                 frequency="d", adjustflag=adjust
             )
-            
+
             if rs.error_code != '0':
                 return pd.DataFrame()
 
-            data_list = []
+            # Stream rows straight into typed numpy buffers (doubling on
+            # growth) instead of collecting string lists and re-parsing every
+            # column with pd.to_numeric afterwards — one pass, one cast.
+            numeric_fields = ['open', 'high', 'low', 'close', 'volume', 'amount', 'turn', 'pctChg']
+            field_idx = {f: rs.fields.index(f) for f in rs.fields}
+            cap = 1024
+            # float32: A-share OHLCV carries 2-3 significant decimals, well
+            # inside f32 precision, and half the bytes through every
+            # downstream rolling pass. Kernels that need f64 accuracy
+            # upcast at their boundary (to_numpy(dtype=np.float64)).
+            bufs = {f: np.empty(cap, dtype=np.float32) for f in numeric_fields}
+            dates = []
+            codes = []
+
+            i = 0
             while rs.next():
-                data_list.append(rs.get_row_data())
-                
-            if not data_list:
+                row = rs.get_row_data()
+                if i == cap:
+                    cap *= 2
+                    for f in numeric_fields:
+                        grown = np.empty(cap, dtype=np.float32)
+                        grown[:i] = bufs[f]
+                        bufs[f] = grown
+                dates.append(row[field_idx['date']])
+                codes.append(row[field_idx['code']])
+                for f in numeric_fields:
+                    v = row[field_idx[f]]
+                    try:
+                        bufs[f][i] = float(v) if v else np.nan
+                    except ValueError:
+                        bufs[f][i] = np.nan
+                i += 1
+
+            if i == 0:
                 return pd.DataFrame()
-                
-            df = pd.DataFrame(data_list, columns=rs.fields)
-            
-            # Convert types
-            numeric_cols = ['open', 'high', 'low', 'close', 'volume', 'amount', 'turn', 'pctChg']
-            for col in numeric_cols:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
-                
-            # Rename for compatibility
-            df.rename(columns={'turn': 'turnover', 'pctChg': 'pct_change'}, inplace=True)
-            df['date'] = pd.to_datetime(df['date']).dt.date
-            
-            # 3. Save to Cache
-            df.to_csv(cache_file, index=False)
-            
+
+            # Columns are already typed; names renamed for compatibility
+            df = pd.DataFrame({
+                'date': pd.to_datetime(dates).date,
+                'code': codes,
+                'open': bufs['open'][:i],
+                'high': bufs['high'][:i],
+                'low': bufs['low'][:i],
+                'close': bufs['close'][:i],
+                'volume': bufs['volume'][:i],
+                'amount': bufs['amount'][:i],
+                'turnover': bufs['turn'][:i],
+                'pct_change': bufs['pctChg'][:i],
+            }, copy=False)
+
             return df
-            
+
         except Exception as e:
             print(f"Error downloading {symbol}: {e}")
             return pd.DataFrame()
 
+    @staticmethod
+    def get_stock_daily_cached(symbol: str, start_date: str, end_date: str,
+                               adjust: str = "2", cache_dir: str = None) -> pd.DataFrame:
+        """
+        Parquet-backed variant of get_stock_daily that only ever fetches
+        the missing tail.
+
+        Historical bars never change, so after the first full download a
+        daily scan costs one tiny range query per symbol (typically a
+        single row) plus a local parquet read — the scan becomes
+        compute-bound instead of network-bound.
+        """
+        if cache_dir is None:
+            cache_dir = DataLoader.CACHE_DIR
+        if len(end_date) == 8:
+            end_date = f"{end_date[:4]}-{end_date[4:6]}-{end_date[6:]}"
+
+        cache_file = DataLoader._cache_path(cache_dir, symbol)
+
+        df = None
+        if cache_file is not None:
+            try:
+                df = DataLoader._read_cache(cache_file)
+            except Exception as e:
+                print(f"Error reading cache for {symbol}: {e}")
+                df = None
+
+        if df is not None and not df.empty:
+            return DataLoader._refresh_tail(df, symbol, end_date, adjust, cache_file)
+
+        # Cold cache: full download
+        df = DataLoader._download_daily(symbol, start_date, end_date, adjust)
+        if not df.empty:
+            DataLoader._write_cache_atomic(
+                df, DataLoader._cache_path(cache_dir, symbol, existing=False))
+        return df
+
+    @staticmethod
+    def _refresh_tail(df: pd.DataFrame, symbol: str, end_date: str,
+                      adjust: str, cache_file: str) -> pd.DataFrame:
+        """
+        Append any bars newer than the cached history (usually one row per
+        scan day) and persist the merged frame. No-op when up to date.
+        """
+        last_date = str(df['date'].max())
+        if last_date < end_date:
+            delta_start = (pd.Timestamp(last_date) + pd.Timedelta(days=1)).strftime('%Y-%m-%d')
+            delta = DataLoader._download_daily(symbol, delta_start, end_date, adjust)
+            if not delta.empty:
+                df = pd.concat([df, delta], ignore_index=True)
+                df = df.drop_duplicates('date', keep='last')
+                DataLoader._write_cache_atomic(df, cache_file)
+        return df
+
+    @staticmethod
+    def _cache_path(cache_dir: str, symbol: str, existing: bool = True) -> Optional[str]:
+        """
+        Resolve the cache file for a symbol.
+
+        With existing=True, return whichever on-disk entry matches (the
+        configured format first, then the other — so flipping CACHE_FORMAT
+        keeps old entries readable), or None when there is no entry yet.
+        With existing=False, return the path a new entry should be written
+        to in the configured format.
+        """
+        file_symbol = symbol.replace('.', '_')
+        ext = DataLoader.CACHE_FORMAT
+        preferred = os.path.join(cache_dir, f"{file_symbol}.{ext}")
+        if not existing:
+            return preferred
+        other_ext = 'feather' if ext == 'parquet' else 'parquet'
+        other = os.path.join(cache_dir, f"{file_symbol}.{other_ext}")
+        if os.path.exists(preferred):
+            return preferred
+        if os.path.exists(other):
+            return other
+        return None
+
+    @staticmethod
+    def _read_cache(cache_file: str) -> pd.DataFrame:
+        """
+        Read a cache entry, dispatching on extension.
+
+        Feather entries are opened through pyarrow.memory_map: the
+        uncompressed IPC file is mapped zero-copy, so many scanner workers
+        reading the same symbol share one set of OS pages instead of each
+        allocating and decompressing a private copy.
+        """
+        if cache_file.endswith('.feather'):
+            if PYARROW_AVAILABLE:
+                with pa.memory_map(cache_file) as source:
+                    df = pa.ipc.open_file(source).read_all().to_pandas()
+            else:
+                df = pd.read_feather(cache_file)
+        else:
+            df = pd.read_parquet(cache_file)
+        return DataLoader._downcast_f32(df)
+
+    _FLOAT_COLS = ('open', 'high', 'low', 'close', 'volume', 'amount',
+                   'turnover', 'pct_change')
+
+    @staticmethod
+    def _read_legacy_csv(path: str) -> pd.DataFrame:
+        """
+        Parse an old CSV cache entry, preferring pyarrow's multithreaded
+        tokenizer (typed straight to float32, zero-copy to pandas) over
+        pandas' single-threaded C parser.
+        """
+        if PYARROW_AVAILABLE:
+            col_types = {c: pa.float32() for c in DataLoader._FLOAT_COLS}
+            table = pa_csv.read_csv(
+                path,
+                convert_options=pa_csv.ConvertOptions(column_types=col_types))
+            df = table.to_pandas()
+        else:
+            df = DataLoader._downcast_f32(pd.read_csv(path))
+        df['date'] = pd.to_datetime(df['date']).dt.date
+        return df
+
+    @staticmethod
+    def _downcast_f32(df: pd.DataFrame) -> pd.DataFrame:
+        """Shrink legacy float64 cache entries to the float32 working dtype."""
+        for c in DataLoader._FLOAT_COLS:
+            if c in df.columns and df[c].dtype == np.float64:
+                df[c] = df[c].astype(np.float32)
+        return df
+
+    @staticmethod
+    def _write_cache_atomic(df: pd.DataFrame, cache_file: str):
+        """Write a cache entry via a temp file + rename; never fail the fetch."""
+        try:
+            os.makedirs(os.path.dirname(cache_file) or '.', exist_ok=True)
+            tmp_file = cache_file + '.tmp'
+            if cache_file.endswith('.feather') and PYARROW_AVAILABLE:
+                # Uncompressed on purpose: mmap readers get raw Arrow buffers
+                table = pa.Table.from_pandas(df, preserve_index=False)
+                pa_feather.write_feather(table, tmp_file, compression='uncompressed')
+            else:
+                df.to_parquet(tmp_file, index=False)
+            os.replace(tmp_file, cache_file)
+        except Exception as e:
+            print(f"Error writing cache {cache_file}: {e}")
+
+    @classmethod
+    def get_many(cls, symbols: List[str], start_date: str, end_date: str,
+                 adjust: str = "2", max_workers: int = 8) -> Dict[str, pd.DataFrame]:
+        """
+        Fetch daily history for many symbols concurrently.
+
+        Each get_stock_daily call spends most of its time blocked on
+        BaoStock socket I/O (GIL released), so a thread pool overlaps the
+        round-trips. Login is handled once via ensure_session/_login_lock.
+        Keep max_workers modest (8-16) to stay under server rate limits.
+
+        Returns:
+            dict: symbol -> DataFrame (empty frames are skipped).
+        """
+        cls.ensure_session()
+        results: Dict[str, pd.DataFrame] = {}
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            future_map = {
+                executor.submit(cls.get_stock_daily, sym, start_date, end_date, adjust): sym
+                for sym in symbols
+            }
+            for future in concurrent.futures.as_completed(future_map):
+                sym = future_map[future]
+                try:
+                    df = future.result()
+                    if not df.empty:
+                        results[sym] = df
+                except Exception as e:
+                    print(f"Error fetching {sym}: {e}")
+        return results
+
+    @classmethod
+    def load_panel(cls, symbols: List[str], start_date: str, end_date: str,
+                   adjust: str = "2", max_workers: int = 8):
+        """
+        Stack many symbols into one right-aligned (S, T, 6) float32 panel.
+
+        Channels are open/high/low/close/volume/turnover; symbols with a
+        shorter history are left-padded with NaN and `lengths` carries each
+        symbol's valid bar count. A whole-universe pass then becomes one
+        matrix kernel (see Strategy.scan_panel) instead of a Python loop
+        over per-symbol DataFrames.
+
+        Returns:
+            (codes, dates, panel, lengths). `dates` is the date axis of the
+            longest history (tail-aligned for every row).
+        """
+        frames = cls.get_many(symbols, start_date, end_date, adjust,
+                              max_workers=max_workers)
+        codes = [s for s in symbols if s in frames]
+        if not codes:
+            return ([], np.array([]),
+                    np.zeros((0, 0, 6), dtype=np.float32),
+                    np.zeros(0, dtype=np.int64))
+
+        lengths = np.array([len(frames[s]) for s in codes], dtype=np.int64)
+        S = len(codes)
+        T = int(lengths.max())
+        panel = np.full((S, T, 6), np.nan, dtype=np.float32)
+        channels = ('open', 'high', 'low', 'close', 'volume', 'turnover')
+        for i, sym in enumerate(codes):
+            df = frames[sym]
+            n = len(df)
+            for j, c in enumerate(channels):
+                panel[i, T - n:, j] = df[c].to_numpy(dtype=np.float32)
+
+        dates = frames[codes[int(np.argmax(lengths))]]['date'].to_numpy()
+        return codes, dates, panel, lengths
+
+    @staticmethod
+    def get_stock_daily_np(symbol: str, start_date: str, end_date: str,
+                           adjust: str = "2") -> dict:
+        """
+        Same data as get_stock_daily, but returned as a dict of numpy
+        arrays (SoA layout) for the numeric hot path.
+
+        The scanner kernels immediately strip the DataFrame down to
+        arrays anyway; this skips the pandas blocks/index round-trip for
+        callers that never need frame semantics.
+
+        Returns:
+            dict: column name -> np.ndarray. Empty dict when no data.
+        """
+        df = DataLoader.get_stock_daily(symbol, start_date, end_date, adjust)
+        if df.empty:
+            return {}
+
+        float_cols = ['open', 'high', 'low', 'close', 'volume', 'amount',
+                      'turnover', 'pct_change']
+        arrays = {col: df[col].to_numpy(dtype=np.float64)
+                  for col in float_cols if col in df.columns}
+        arrays['date'] = df['date'].to_numpy()
+        return arrays
+
+    @staticmethod
+    def get_stock_daily_soa(symbol: str, start_date: str, end_date: str,
+                            adjust: str = "2"):
+        """
+        Daily history as a BarSoA (contiguous per-column arrays), the
+        preferred form for the numeric scanner pipeline.
+
+        Returns None when no data is available.
+        """
+        from .soa import BarSoA
+        df = DataLoader.get_stock_daily(symbol, start_date, end_date, adjust)
+        if df.empty:
+            return None
+        return BarSoA.from_df(df)
+
     @staticmethod
     def get_all_stocks() -> List[str]:
         """
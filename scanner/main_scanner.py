@@ -90,7 +90,7 @@ class MainScanner:
                 return None
                 
             # Analyze
-            res = Strategy.analyze_daily(df)
+            res = Strategy.analyze_daily(df, symbol=symbol)
             res['symbol'] = symbol
             
             return res
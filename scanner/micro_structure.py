@@ -1,6 +1,69 @@
 import pandas as pd
 import numpy as np
 
+from ._njit import njit, NUMBA_AVAILABLE, nb_types
+
+
+if NUMBA_AVAILABLE:
+    # Book/trade columns are Series.to_numpy() output and may be read-only
+    # (see _njit), so the eager signatures declare them as such
+    _f8_ro = nb_types.Array(nb_types.float64, 1, 'A', readonly=True)
+    _OFI_SIG = nb_types.float64(_f8_ro, _f8_ro, _f8_ro, _f8_ro)
+    _TICK_SIG = nb_types.int8[:](_f8_ro)
+else:
+    _OFI_SIG = None
+    _TICK_SIG = None
+
+
+@njit(_OFI_SIG, cache=True, fastmath=True)
+def _ofi_sum(bp: np.ndarray, bq: np.ndarray, ap: np.ndarray, aq: np.ndarray) -> float:
+    """
+    Fused OFI accumulation over both book sides in one sequential pass.
+
+    Replaces four np.roll copies and two nested np.where cascades with a
+    single loop that Numba compiles down to straight-line code.
+    """
+    total = 0.0
+    for i in range(1, bp.size):
+        # Bid side flow (e_b)
+        if bp[i] > bp[i - 1]:
+            e_b = bq[i]
+        elif bp[i] == bp[i - 1]:
+            e_b = bq[i] - bq[i - 1]
+        else:
+            e_b = -bq[i - 1]
+
+        # Ask side flow (e_a), Rama Cont definition
+        if ap[i] < ap[i - 1]:
+            e_a = aq[i]
+        elif ap[i] == ap[i - 1]:
+            e_a = aq[i] - aq[i - 1]
+        else:
+            e_a = -aq[i - 1]
+
+        total += e_b - e_a
+
+    return total
+
+
+@njit(_TICK_SIG, cache=True)
+def _tick_sign_ffill(price: np.ndarray) -> np.ndarray:
+    """
+    Tick-rule signs with the last non-zero sign carried forward, in one
+    pass. int8 output: 8x smaller than the float64 sign series.
+    """
+    out = np.zeros(price.size, dtype=np.int8)
+    last = np.int8(0)
+    for i in range(1, price.size):
+        d = price[i] - price[i - 1]
+        if d > 0:
+            last = 1
+        elif d < 0:
+            last = -1
+        out[i] = last
+    return out
+
+
 class MicroStructure:
     """
     Micro-structure indicators: OFI (Order Flow Imbalance) and VPIN.
@@ -20,59 +83,41 @@ class MicroStructure:
         """
         if ticks.empty or len(ticks) < 2:
             return 0.0
-            
-        # Vectorized calculation
-        
+
         # Bid Side Flow (e_b)
-        b_p = ticks['bid1_price'].values
-        b_q = ticks['bid1_volume'].values
-        
-        # Shifted (prev)
-        b_p_prev = np.roll(b_p, 1)
-        b_q_prev = np.roll(b_q, 1)
-        b_p_prev[0] = b_p[0] # Handle first element
-        b_q_prev[0] = b_q[0]
-        
+        b_p = ticks['bid1_price'].to_numpy(dtype=np.float64)
+        b_q = ticks['bid1_volume'].to_numpy(dtype=np.float64)
+
+        if NUMBA_AVAILABLE:
+            # Single fused pass over both sides, no temporaries
+            a_p = ticks['ask1_price'].to_numpy(dtype=np.float64)
+            a_q = ticks['ask1_volume'].to_numpy(dtype=np.float64)
+            return _ofi_sum(b_p, b_q, a_p, a_q)
+
+        # Vectorized fallback without numba.
+        # Use zero-copy slices (x[1:] vs x[:-1]) for current/previous pairs
+        # instead of np.roll, which copies the whole array per side.
+
         # Logic:
         # P > P_prev: flow = q
         # P == P_prev: flow = q - q_prev
         # P < P_prev: flow = -q_prev
-        
-        # We can implement this with condition masks
-        e_b = np.where(b_p > b_p_prev, b_q,
-                       np.where(b_p == b_p_prev, b_q - b_q_prev, -b_q_prev))
-        # First element is invalid/zero
-        e_b[0] = 0
-        
+        e_b = np.where(b_p[1:] > b_p[:-1], b_q[1:],
+                       np.where(b_p[1:] == b_p[:-1], b_q[1:] - b_q[:-1], -b_q[:-1]))
+
         # Ask Side Flow (e_a)
-        a_p = ticks['ask1_price'].values
-        a_q = ticks['ask1_volume'].values
-        
-        a_p_prev = np.roll(a_p, 1)
-        a_q_prev = np.roll(a_q, 1)
-        a_p_prev[0] = a_p[0]
-        a_q_prev[0] = a_q[0]
-        
-        # Ask logic (similar but impact is opposite? No, formula definition for inflow):
-        # P < P_prev: flow = q (Price improved/lowered -> new stack)
-        # P == P_prev: flow = q - q_prev
-        # P > P_prev: flow = -q_prev (Price rose -> old stack gone)
-        
-        # Wait, Rama Cont definition:
-        # e_n_t (Ask side):
+        a_p = ticks['ask1_price'].to_numpy(dtype=np.float64)
+        a_q = ticks['ask1_volume'].to_numpy(dtype=np.float64)
+
+        # Rama Cont definition, ask side:
         # If P < P_prev (Best Ask Dropped): q (New limit orders)
         # If P == P_prev: q - q_prev
         # If P > P_prev (Best Ask Rose): -q_prev (Orders consumed/cancelled)
-        
-        e_a = np.where(a_p < a_p_prev, a_q,
-                       np.where(a_p == a_p_prev, a_q - a_q_prev, -a_q_prev))
-        e_a[0] = 0
-        
-        # Net OFI
-        ofi = e_b - e_a
-        
-        # Return Cumulative OFI
-        return np.sum(ofi)
+        e_a = np.where(a_p[1:] < a_p[:-1], a_q[1:],
+                       np.where(a_p[1:] == a_p[:-1], a_q[1:] - a_q[:-1], -a_q[:-1]))
+
+        # Net OFI, accumulated (first tick has no predecessor and contributes 0)
+        return np.sum(e_b - e_a)
 
     @staticmethod
     def calculate_vpin(trades: pd.DataFrame, bucket_volume: int = 10000, window_buckets: int = 50) -> float:
@@ -89,59 +134,62 @@ class MicroStructure:
         if trades.empty:
             return 0.0
             
+        # Extract once; everything below stays in numpy — no trades.copy(),
+        # no intermediate pandas columns.
+        price = trades['price'].to_numpy(dtype=np.float64)
+        vol = trades['volume'].to_numpy(dtype=np.float64)
+
         # 1. Trade Classification (Lee-Ready)
         # If we don't have Bid/Ask mid in 'trades', we use Tick Rule (Price Change).
-        # trades['price'] vs trades['price'].shift(1)
-        
-        price_diff = trades['price'].diff()
-        
-        # 0 diff handling: use last non-zero. simpler: ffill the 'sign'.
-        # sign: 1 (Buy), -1 (Sell)
-        signs = np.sign(price_diff)
-        signs = signs.replace(0, np.nan).ffill().fillna(0) # 0 for start
-        
+        # sign: 1 (Buy), -1 (Sell); 0 diff handling: carry the last non-zero sign.
+        if NUMBA_AVAILABLE:
+            signs_arr = _tick_sign_ffill(price)
+        else:
+            signs_arr = np.sign(np.diff(price, prepend=price[0]))
+            nz = np.where(signs_arr != 0, np.arange(signs_arr.size), 0)
+            np.maximum.accumulate(nz, out=nz)
+            signs_arr = signs_arr[nz]  # first ticks stay 0 until a price change
+
         # Buy Vol, Sell Vol
         # If sign > 0: Buy Volume = Volume, Sell = 0
         # If sign < 0: Sell Volume = Volume, Buy = 0
-        
-        trades = trades.copy()
-        trades['buy_vol'] = np.where(signs > 0, trades['volume'], 0)
-        trades['sell_vol'] = np.where(signs < 0, trades['volume'], 0)
-        
+        buy_vol = np.where(signs_arr > 0, vol, 0.0)
+        sell_vol = np.where(signs_arr < 0, vol, 0.0)
+
         # 2. Bucketing
-        # We need to aggregate into volume buckets
-        # This is strictly sequential.
-        
-        cum_vol = trades['volume'].cumsum()
-        # Determine bucket indices
-        # bucket_id = cum_vol // bucket_volume
-        
-        trades['bucket'] = (cum_vol // bucket_volume).astype(int)
-        
-        # Group by bucket
-        # We want OI (Order Imbalance) per bucket = |Buy - Sell|
-        
-        bucket_stats = trades.groupby('bucket').agg({
-            'buy_vol': 'sum',
-            'sell_vol': 'sum'
-        })
-        
-        bucket_stats['OI'] = np.abs(bucket_stats['buy_vol'] - bucket_stats['sell_vol'])
-        bucket_stats['Total'] = bucket_stats['buy_vol'] + bucket_stats['sell_vol'] 
+        # Aggregate into volume buckets. bucket_id = cum_vol // bucket_volume.
+        # np.bincount sums per bucket in one contiguous C loop — no groupby
+        # hash table, no extra columns on the trades frame.
+        buckets = (np.cumsum(vol) // bucket_volume).astype(np.int64)
+
+        buy_per_bucket = np.bincount(buckets, weights=buy_vol)
+        sell_per_bucket = np.bincount(buckets, weights=sell_vol)
+
+        # A single trade bigger than bucket_volume makes cum-volume skip
+        # bucket ids; bincount materializes those as empty rows, which a
+        # groupby on occupied ids never would. Keep only buckets that saw
+        # a trade so the trailing window counts real buckets.
+        occupied = np.bincount(buckets) > 0
+        buy_per_bucket = buy_per_bucket[occupied]
+        sell_per_bucket = sell_per_bucket[occupied]
+
+        # OI (Order Imbalance) per bucket = |Buy - Sell|
+        oi = np.abs(buy_per_bucket - sell_per_bucket)
+        total = buy_per_bucket + sell_per_bucket
         # Note: Total should be approx bucket_volume (except last one)
-        
+
         # 3. VPIN Calculation (Rolling mean of OI / Average Volume)
         # VPIN = Sum(OI over N buckets) / (N * bucket_volume)
-        
-        if len(bucket_stats) < window_buckets:
+
+        if len(oi) < window_buckets:
             # Not enough data
             return 0.0
-            
-        recent_oi_sum = bucket_stats['OI'].tail(window_buckets).sum()
-        total_vol = bucket_stats['Total'].tail(window_buckets).sum()
-        
+
+        recent_oi_sum = oi[-window_buckets:].sum()
+        total_vol = total[-window_buckets:].sum()
+
         if total_vol == 0:
             return 0.0
-            
+
         vpin = recent_oi_sum / total_vol
         return vpin
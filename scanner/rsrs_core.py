@@ -1,93 +1,177 @@
-import pandas as pd
-import numpy as np
-import statsmodels.api as sm
-from typing import Tuple
-
-class RSRSCore:
-    """
-    RSRS (Resistance Support Relative Strength) Strategy.
-    Based on OLS regression of High vs Low prices.
-    """
-    
-    @staticmethod
-    def calculate_rsrs(df: pd.DataFrame, n: int = 18, m: int = 600) -> dict:
-        """
-        Calculate RSRS, Beta, R2 and Standardized RSRS Score.
-        
-        Args:
-            df: DataFrame with 'high' and 'low' columns.
-            n: Regression period (days), default 18.
-            m: Standardization window (days), default 600.
-            
-        Returns:
-            dict containing latest 'beta', 'r2', 'rsrs_score'.
-        """
-        if len(df) < n + 1:
-            return {'beta': 0, 'r2': 0, 'rsrs_score': 0}
-            
-        # We need to calculate Beta and R2 on a rolling basis to standardize them.
-        # However, rolling OLS is slow.
-        # For scanning current state, we only strictly need the *latest* Beta/R2, 
-        # BUT we need history of Beta to calculate Z-Score.
-        
-        # Optimization:
-        # 1. Calculate Betas for the last M days.
-        # 2. Calculate Z-Score from these M Betas.
-        
-        # Work with arrays for speed
-        highs = df['high'].values
-        lows = df['low'].values
-        
-        # Limit processing to needed window (M + N) to save time
-        if len(highs) > (m + n + 10):
-            highs = highs[-(m + n + 10):]
-            lows = lows[-(m + n + 10):]
-            
-        betas = []
-        r2s = []
-        
-        # Rolling OLS - can be vectorized using stride_tricks? 
-        # Simple loop for 'm' times likely acceptable for simple scan (~600 iters).
-        # For full history backtest it's slow, but for "Scanner", we just need the end result.
-        
-        for i in range(len(highs) - n + 1):
-            y = highs[i : i+n]
-            x = lows[i : i+n]
-            x = sm.add_constant(x)
-            
-            try:
-                model = sm.OLS(y, x)
-                results = model.fit()
-                betas.append(results.params[1]) # slope matches Low
-                r2s.append(results.rsquared)
-            except:
-                betas.append(0)
-                r2s.append(0)
-                
-        if not betas:
-            return {'beta': 0, 'r2': 0, 'rsrs_score': 0}
-
-        # Latest values
-        latest_beta = betas[-1]
-        latest_r2 = r2s[-1]
-        
-        # Standardize Beta (RSRS Score)
-        # using the last M betas (excluding current one? usually inclusive)
-        recent_betas = np.array(betas[-m:])
-        mean_beta = np.mean(recent_betas)
-        std_beta = np.std(recent_betas)
-        
-        if std_beta == 0:
-            z_score = 0
-        else:
-            z_score = (latest_beta - mean_beta) / std_beta
-            
-        # RSRS_Std = Z_Score * R2 (Weighted by R2)
-        rsrs_std = z_score * latest_r2
-        
-        return {
-            'beta': latest_beta,
-            'r2': latest_r2,
-            'z_score': z_score,
-            'rsrs_score': rsrs_std
-        }
+import pandas as pd
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from typing import Tuple
+
+from ._njit import njit, NUMBA_AVAILABLE, nb_types
+
+if NUMBA_AVAILABLE:
+    # Inputs arrive via Series.to_numpy(), which can be read-only under
+    # pandas copy-on-write — the signatures must say so (see _njit)
+    _f8_ro = nb_types.Array(nb_types.float64, 1, 'A', readonly=True)
+    _RSRS_SIG = nb_types.Tuple((nb_types.float64[:], nb_types.float64[:]))(
+        _f8_ro, _f8_ro, nb_types.int64)
+    _MEAN_STD_SIG = nb_types.UniTuple(nb_types.float64, 2)(_f8_ro)
+else:
+    _RSRS_SIG = None
+    _MEAN_STD_SIG = None
+
+
+@njit(_RSRS_SIG, cache=True, fastmath=True)
+def _rsrs_rolling(highs: np.ndarray, lows: np.ndarray, n: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Streaming rolling OLS: one pass with rank-1 updates of the running
+    sums as the window slides. O(1) extra memory — no (W, n) window
+    matrices — and LLVM-compiled when numba is present.
+    """
+    size = highs.size
+    W = size - n + 1
+    betas = np.zeros(W, dtype=np.float64)
+    r2s = np.zeros(W, dtype=np.float64)
+
+    Sx = 0.0
+    Sy = 0.0
+    Sxy = 0.0
+    Sxx = 0.0
+    Syy = 0.0
+    for i in range(n):
+        x = lows[i]
+        y = highs[i]
+        Sx += x
+        Sy += y
+        Sxy += x * y
+        Sxx += x * x
+        Syy += y * y
+
+    fn = float(n)
+    for w in range(W):
+        var_x = fn * Sxx - Sx * Sx
+        var_y = fn * Syy - Sy * Sy
+        cov = fn * Sxy - Sx * Sy
+        if var_x > 0.0:
+            betas[w] = cov / var_x
+            if var_y > 0.0:
+                r2s[w] = (cov * cov) / (var_x * var_y)
+
+        if w + n < size:
+            xo = lows[w]
+            yo = highs[w]
+            xn = lows[w + n]
+            yn = highs[w + n]
+            Sx += xn - xo
+            Sy += yn - yo
+            Sxy += xn * yn - xo * yo
+            Sxx += xn * xn - xo * xo
+            Syy += yn * yn - yo * yo
+
+    return betas, r2s
+
+
+@njit(_MEAN_STD_SIG, cache=True, fastmath=True)
+def _mean_std(a: np.ndarray) -> Tuple[float, float]:
+    """
+    One-pass Welford mean and population std. np.mean + np.std walk the
+    array twice; this streams it once — per symbol it is a 600-element
+    window, across a universe scan the saved traffic adds up.
+    """
+    n = 0
+    mean = 0.0
+    m2 = 0.0
+    for x in a:
+        n += 1
+        d = x - mean
+        mean += d / n
+        m2 += d * (x - mean)
+    if n == 0:
+        return 0.0, 0.0
+    return mean, np.sqrt(m2 / n)
+
+
+class RSRSCore:
+    """
+    RSRS (Resistance Support Relative Strength) Strategy.
+    Based on OLS regression of High vs Low prices.
+    """
+
+    @staticmethod
+    def calculate_rsrs(df: pd.DataFrame, n: int = 18, m: int = 600) -> dict:
+        """
+        Calculate RSRS, Beta, R2 and Standardized RSRS Score.
+
+        Args:
+            df: DataFrame with 'high' and 'low' columns.
+            n: Regression period (days), default 18.
+            m: Standardization window (days), default 600.
+
+        Returns:
+            dict containing latest 'beta', 'r2', 'rsrs_score'.
+        """
+        if len(df) < n + 1:
+            return {'beta': 0, 'r2': 0, 'rsrs_score': 0}
+
+        # We need to calculate Beta and R2 on a rolling basis to standardize them.
+        # For scanning current state, we only strictly need the *latest* Beta/R2,
+        # BUT we need history of Beta to calculate Z-Score.
+
+        # Work with arrays for speed
+        highs = df['high'].to_numpy(dtype=np.float64)
+        lows = df['low'].to_numpy(dtype=np.float64)
+
+        # Limit processing to needed window (M + N) to save time
+        if len(highs) > (m + n + 10):
+            highs = highs[-(m + n + 10):]
+            lows = lows[-(m + n + 10):]
+
+        if NUMBA_AVAILABLE:
+            # Streaming kernel: rank-1 updates, no window matrices
+            betas, r2s = _rsrs_rolling(highs, lows, n)
+        else:
+            # Closed-form rolling OLS over strided window views — replaces one
+            # statsmodels OLS fit (and Results object) per window with a few
+            # whole-array reductions:
+            #   beta = Sxy / Sxx,   R2 = Sxy^2 / (Sxx * Syy)
+            # (For a single 2-column regression this also beats a LAPACK
+            # lstsq call per window: no per-fit driver overhead at all.)
+            Y = sliding_window_view(highs, n)  # shape (W, n)
+            X = sliding_window_view(lows, n)
+
+            mx = X.mean(axis=1)
+            my = Y.mean(axis=1)
+            xc = X - mx[:, None]
+            yc = Y - my[:, None]
+            Sxx = np.einsum('ij,ij->i', xc, xc)
+            Sxy = np.einsum('ij,ij->i', xc, yc)
+            Syy = np.einsum('ij,ij->i', yc, yc)
+
+            # Guard degenerate windows (flat prices -> zero variance)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                betas = np.where(Sxx > 0, Sxy / Sxx, 0.0)
+                r2s = np.where((Sxx > 0) & (Syy > 0), (Sxy * Sxy) / (Sxx * Syy), 0.0)
+
+        # Latest values
+        latest_beta = betas[-1]
+        latest_r2 = r2s[-1]
+
+        # Standardize Beta (RSRS Score)
+        # using the last M betas (excluding current one? usually inclusive)
+        recent_betas = betas[-m:]
+        if NUMBA_AVAILABLE:
+            mean_beta, std_beta = _mean_std(recent_betas)
+        else:
+            mean_beta = np.mean(recent_betas)
+            std_beta = np.std(recent_betas)
+
+        if std_beta == 0:
+            z_score = 0
+        else:
+            z_score = (latest_beta - mean_beta) / std_beta
+
+        # RSRS_Std = Z_Score * R2 (Weighted by R2)
+        rsrs_std = z_score * latest_r2
+
+        return {
+            'beta': latest_beta,
+            'r2': latest_r2,
+            'z_score': z_score,
+            'rsrs_score': rsrs_std
+        }
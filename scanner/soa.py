@@ -0,0 +1,51 @@
+import pandas as pd
+import numpy as np
+from dataclasses import dataclass
+
+
+@dataclass
+class BarSoA:
+    """
+    Structure-of-arrays view of one symbol's daily bars.
+
+    Every core module ends up converting its DataFrame argument to numpy
+    anyway; BarSoA does that conversion exactly once per symbol and hands
+    contiguous float64 columns through the pipeline. to_df() wraps the
+    same buffers in a frame (no copy) for code that still wants pandas
+    semantics.
+    """
+    date: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+    turnover: np.ndarray
+
+    @classmethod
+    def from_df(cls, df: pd.DataFrame) -> "BarSoA":
+        return cls(
+            date=df['date'].to_numpy(),
+            open=df['open'].to_numpy(dtype=np.float64),
+            high=df['high'].to_numpy(dtype=np.float64),
+            low=df['low'].to_numpy(dtype=np.float64),
+            close=df['close'].to_numpy(dtype=np.float64),
+            volume=df['volume'].to_numpy(dtype=np.float64),
+            turnover=df['turnover'].to_numpy(dtype=np.float64),
+        )
+
+    def to_df(self) -> pd.DataFrame:
+        # Column-per-array construction: the frame references the same
+        # buffers, it does not copy them
+        return pd.DataFrame({
+            'date': self.date,
+            'open': self.open,
+            'high': self.high,
+            'low': self.low,
+            'close': self.close,
+            'volume': self.volume,
+            'turnover': self.turnover,
+        }, copy=False)
+
+    def __len__(self) -> int:
+        return len(self.close)
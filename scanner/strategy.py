@@ -1,10 +1,59 @@
 import pandas as pd
+import numpy as np
 import pandas_ta as ta  # optional, if installed
-from .chan_core import ChanCore
+from typing import List, Optional, Tuple
+from .chan_core import ChanCore, ChanContext
+from .soa import BarSoA
 from .wave_core import WaveCore
 from .rsrs_core import RSRSCore
 from .chip_core import ChipCore
 from .micro_structure import MicroStructure
+from ._njit import njit, prange, NUMBA_AVAILABLE
+
+
+@njit('Tuple((float64[:], boolean[:]))(float32[:,:,:], int64[:])',
+      cache=True, parallel=True)
+def _panel_macro_scan(panel: np.ndarray, lengths: np.ndarray):
+    """
+    Macro gate over a right-aligned (S, T, 6) panel, symbols in prange.
+
+    Per symbol: MA20 > MA60 on the close channel and the latest 18-bar
+    RSRS beta (OLS of high on low), accumulated in float64. One parallel
+    C kernel across the universe instead of a Python loop per symbol.
+    """
+    S = lengths.size
+    T = panel.shape[1]
+    betas = np.zeros(S, dtype=np.float64)
+    ma_ok = np.zeros(S, dtype=np.bool_)
+
+    for s in prange(S):
+        if lengths[s] < 60:
+            continue
+        s20 = 0.0
+        for t in range(T - 20, T):
+            s20 += panel[s, t, 3]
+        s60 = 0.0
+        for t in range(T - 60, T):
+            s60 += panel[s, t, 3]
+        ma_ok[s] = (s20 / 20.0) > (s60 / 60.0)
+
+        Sx = 0.0
+        Sy = 0.0
+        Sxy = 0.0
+        Sxx = 0.0
+        for t in range(T - 18, T):
+            x = float(panel[s, t, 2])  # low
+            y = float(panel[s, t, 1])  # high
+            Sx += x
+            Sy += y
+            Sxy += x * y
+            Sxx += x * x
+        var_x = 18.0 * Sxx - Sx * Sx
+        if var_x > 0.0:
+            betas[s] = (18.0 * Sxy - Sx * Sy) / var_x
+
+    return betas, ma_ok
+
 
 class Strategy:
     """
@@ -13,28 +62,240 @@ class Strategy:
     """
 
     @staticmethod
-    def analyze_daily(df: pd.DataFrame) -> dict:
+    def _prepare_features(df: pd.DataFrame) -> dict:
+        """
+        Compute the shared rolling features for one symbol in a single
+        cumsum pass over close/median price.
+
+        The sub-modules each re-walked the frame for overlapping stats
+        (AO's two SMAs, the MA20/MA60 filter, the 50-bar extrema); fusing
+        them here traverses the series once and hands arrays down.
+        """
+        high = df['high'].to_numpy(dtype=np.float64)
+        low = df['low'].to_numpy(dtype=np.float64)
+        close = df['close'].to_numpy(dtype=np.float64)
+        n = close.size
+
+        # Median price + both AO SMAs from one prefix sum
+        mp = (high + low) * 0.5
+        cs_mp = np.concatenate(([0.0], np.cumsum(mp)))
+        sma5 = np.full(n, np.nan)
+        sma34 = np.full(n, np.nan)
+        if n >= 5:
+            sma5[4:] = (cs_mp[5:] - cs_mp[:-5]) / 5.0
+        if n >= 34:
+            sma34[33:] = (cs_mp[34:] - cs_mp[:-34]) / 34.0
+        ao = sma5 - sma34
+
+        # Trend filter MAs: only the latest value is ever read, so slice
+        # the tail and reduce — O(80) work instead of a full-history pass
+        ma20 = close[-20:].mean() if n >= 20 else np.nan
+        ma60 = close[-60:].mean() if n >= 60 else np.nan
+
+        return {
+            'close': close,
+            'ao': ao,
+            'ma20': ma20,
+            'ma60': ma60,
+        }
+
+    @staticmethod
+    def compute_features(df: pd.DataFrame, symbol: str = None,
+                         early_exit: bool = False) -> Optional[dict]:
+        """
+        Measure one symbol: raw metrics only, no scoring.
+
+        Separating measurement from scoring lets a scanner collect the
+        metrics for the whole universe first and score them in one
+        vectorized pass (score_batch) instead of branching per symbol.
+
+        With early_exit=True, the cheap macro gates (MA alignment, RSRS)
+        run first and a symbol failing both skips the heavy Chip/Chan/Wave
+        modules entirely — in a typical scan most of the universe fails
+        the macro filter, so most of the CPU work disappears. A gated dict
+        carries 'gated': True and only the macro metrics.
+
+        Returns None when there is not enough data.
+        """
+        soa = None
+        if isinstance(df, BarSoA):
+            # SoA input: keep the arrays, wrap them in a no-copy frame for
+            # the modules that still take pandas
+            soa = df
+            df = soa.to_df()
+
+        if df.empty or len(df) < 60:
+            return None
+
+        # Shared rolling features, computed once and reused below
+        feats = Strategy._prepare_features(df)
+
+        # 1. Macro: RSRS
+        # Using 18 days regression, 600 days normalization (or less if not avail)
+        rsrs_res = RSRSCore.calculate_rsrs(df)
+
+        if early_exit and feats['ma20'] < feats['ma60'] and rsrs_res['rsrs_score'] < 0:
+            # Both macro gates negative: stop here. This is a deliberate
+            # approximation, not a lossless bound — Chip/Chan/Wave could
+            # still add up to +100 — but a symbol failing both macro
+            # filters is judged not worth their CPU cost.
+            return {
+                'date': df['date'].iloc[-1],
+                'close': df['close'].iloc[-1],
+                'rsrs': rsrs_res['rsrs_score'],
+                'ma20': feats['ma20'],
+                'ma60': feats['ma60'],
+                'gated': True,
+            }
+
+        # 2. Macro: Chip Distribution
+        chip_res = ChipCore.calculate_chip_distribution(df)
+
+        # 3. Pattern: Chan Lun
+        # Calc Fractals and Bi (incremental when we know which symbol this is)
+        if symbol:
+            chan_input = ChanCore.find_fractals_incremental(df, symbol)
+        elif soa is not None:
+            # Arrays already extracted — build the context straight from them
+            chan_input = ChanCore.find_fractals(
+                ChanContext(highs=soa.high, lows=soa.low, dates=soa.date))
+        else:
+            # Extract the SoA arrays once; the fractal and bi passes reuse them
+            chan_input = ChanCore.find_fractals(ChanContext.from_df(df))
+        # check_buys only reads the last three bis (and needs >= 4 to act),
+        # so don't materialize the whole history
+        bi_list = ChanCore.get_last_k_bi(chan_input, k=4)
+        chan_res = ChanCore.check_buys(bi_list, df['close'].iloc[-1])
+
+        # 4. Pattern: Elliott Wave (AO)
+        # Attach the precomputed AO so check_wave_structure skips its own pass
+        df['ao'] = feats['ao']
+        wave_res = WaveCore.check_wave_structure(df)
+
+        return {
+            'date': df['date'].iloc[-1],
+            'close': df['close'].iloc[-1],
+            'rsrs': rsrs_res['rsrs_score'],
+            'chip_profit': chip_res['profit_ratio'],
+            'concentration': chip_res['concentration'],
+            'buy2': chan_res['buy2'],
+            'buy3': chan_res['buy3'],
+            'is_wave3': wave_res['is_wave3'],
+            'divergence': wave_res['divergence'],
+            'ma20': feats['ma20'],
+            'ma60': feats['ma60'],
+            'gated': False,
+        }
+
+    @staticmethod
+    def score_batch(features: List[dict]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Score many symbols' features at once, branchlessly.
+
+        Same rules as analyze_daily, expressed as np.where over stacked
+        metric arrays — one pass per rule instead of a Python if-chain per
+        symbol.
+
+        Args:
+            features: list of dicts from compute_features. Gated dicts
+                (early_exit=True) carry only the macro metrics; their
+                missing modules default to no-score contributions, same as
+                analyze_daily's gated path.
+
+        Returns:
+            (scores, signal_buy): float and bool arrays in input order.
+        """
+        n = len(features)
+        if n == 0:
+            return np.zeros(0), np.zeros(0, dtype=bool)
+
+        # .get defaults are the neutral values: a gated dict scores only
+        # on what it measured (rsrs + MA alignment)
+        rsrs = np.array([f['rsrs'] for f in features], dtype=np.float64)
+        profit = np.array([f.get('chip_profit', 0.0) for f in features], dtype=np.float64)
+        conc = np.array([f.get('concentration', 1.0) for f in features], dtype=np.float64)
+        buy2 = np.array([f.get('buy2', False) for f in features], dtype=bool)
+        buy3 = np.array([f.get('buy3', False) for f in features], dtype=bool)
+        wave3 = np.array([f.get('is_wave3', False) for f in features], dtype=bool)
+        diverg = np.array([f.get('divergence', False) for f in features], dtype=bool)
+        ma20 = np.array([f['ma20'] for f in features], dtype=np.float64)
+        ma60 = np.array([f['ma60'] for f in features], dtype=np.float64)
+
+        scores = np.zeros(n, dtype=np.float64)
+        scores += np.where(rsrs > 0.7, 30, np.where(rsrs < -0.7, -30, 0))
+        scores += np.where(profit > 0.9, 20, np.where(profit > 0.5, 10, 0))
+        scores += np.where(conc < 0.15, 10, 0)
+        scores += np.where(buy2, 25, 0)
+        scores += np.where(buy3, 30, 0)
+        scores += np.where(wave3, 15, 0)
+        scores += np.where(diverg, -20, 0)
+        scores += np.where(ma20 > ma60, 5, 0)
+
+        signal_buy = buy2 | buy3
+        return scores, signal_buy
+
+    @staticmethod
+    def scan_panel(panel: np.ndarray, lengths: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Macro gate for a whole universe packed into one panel
+        (DataLoader.load_panel layout: right-aligned (S, T, 6) float32).
+
+        Returns:
+            (betas, ma_ok): latest 18-bar RSRS beta and MA20 > MA60 flag
+            per symbol. Symbols with fewer than 60 bars get (0, False).
+        """
+        if panel.shape[0] == 0:
+            return np.zeros(0), np.zeros(0, dtype=bool)
+
+        if NUMBA_AVAILABLE:
+            return _panel_macro_scan(
+                np.ascontiguousarray(panel, dtype=np.float32),
+                np.ascontiguousarray(lengths, dtype=np.int64))
+
+        # Vectorized fallback: same reductions over the symbol axis
+        close = panel[:, :, 3].astype(np.float64)
+        ma_ok = close[:, -20:].mean(axis=1) > close[:, -60:].mean(axis=1)
+
+        x = panel[:, -18:, 2].astype(np.float64)  # low
+        y = panel[:, -18:, 1].astype(np.float64)  # high
+        Sx = x.sum(axis=1)
+        Sy = y.sum(axis=1)
+        Sxy = (x * y).sum(axis=1)
+        Sxx = (x * x).sum(axis=1)
+        var_x = 18.0 * Sxx - Sx * Sx
+        with np.errstate(divide='ignore', invalid='ignore'):
+            betas = np.where(var_x > 0, (18.0 * Sxy - Sx * Sy) / var_x, 0.0)
+
+        short = lengths < 60
+        betas = np.where(short, 0.0, betas)
+        ma_ok &= ~short
+        return betas, ma_ok
+
+    @staticmethod
+    def analyze_daily(df: pd.DataFrame, symbol: str = None) -> dict:
         """
         Stage 1: Daily Analysis.
         Returns a dictionary of signals and scores.
+
+        Args:
+            df: Daily OHLCV history (DataFrame or BarSoA).
+            symbol: Optional stock code; when given, fractal detection goes
+                through the incremental on-disk cache.
         """
-        if df.empty or len(df) < 60:
+        m = Strategy.compute_features(df, symbol, early_exit=True)
+        if m is None:
             return {'signal': False, 'reason': 'Insufficient Data'}
-            
+
         result = {
             'symbol': '', # Caller fills this
-            'date': df['date'].iloc[-1],
-            'close': df['close'].iloc[-1],
+            'date': m['date'],
+            'close': m['close'],
             'signal_buy': False,
             'score': 0,
             'details': []
         }
-        
-        # 1. Macro: RSRS
-        # Using 18 days regression, 600 days normalization (or less if not avail)
-        rsrs_res = RSRSCore.calculate_rsrs(df)
-        score_rsrs = rsrs_res['rsrs_score']
-        
+
+        score_rsrs = m['rsrs']
         result['rsrs'] = score_rsrs
         if score_rsrs > 0.7:
             result['score'] += 30
@@ -42,61 +303,52 @@ class Strategy:
         elif score_rsrs < -0.7:
             result['score'] -= 30
             result['details'].append(f"RSRS Weak ({score_rsrs:.2f})")
-            
-        # 2. Macro: Chip Distribution
-        chip_res = ChipCore.calculate_chip_distribution(df)
-        profit_ratio = chip_res['profit_ratio']
-        concentration = chip_res['concentration'] # Lower is better? No, formula: (p95-p05)/(p05+p95). Smaller = higher concentration.
-        
-        # Concentration usually < 0.1 is highly concentrated?
-        # Let's say < 0.15 is good.
-        
+
+        if m['gated']:
+            # Weak macro (MA20 < MA60 and RSRS < 0): Chip/Chan/Wave were
+            # skipped by design, so the symbol is reported as-is and
+            # treated as a non-candidate.
+            result['details'].append("Macro gate failed (skipped Chip/Chan/Wave)")
+            return result
+
+        # Chip Distribution. Concentration: (p95-p05)/(p05+p95), smaller =
+        # higher concentration; < 0.15 is good.
+        profit_ratio = m['chip_profit']
         result['chip_profit'] = profit_ratio
         if profit_ratio > 0.9:
             result['score'] += 20
             result['details'].append("Chip: High Profit Ratio (>90%)")
         elif profit_ratio > 0.5:
              result['score'] += 10
-             
-        if concentration < 0.15:
+
+        if m['concentration'] < 0.15:
             result['score'] += 10
             result['details'].append("Chip: Highly Concentrated")
-            
-        # 3. Pattern: Chan Lun
-        # Calc Fractals and Bi
-        df = ChanCore.find_fractals(df)
-        bi_list = ChanCore.get_bi_list(df)
-        chan_res = ChanCore.check_buys(bi_list, df['close'].iloc[-1])
-        
-        if chan_res['buy2']:
+
+        if m['buy2']:
             result['score'] += 25
             result['signal_buy'] = True # Potential Trigger
             result['details'].append("Chan: Buy 2 Point")
-            
-        if chan_res['buy3']:
+
+        if m['buy3']:
             result['score'] += 30
             result['signal_buy'] = True
             result['details'].append("Chan: Buy 3 Point (Strong Breakout)")
-            
-        # 4. Pattern: Elliott Wave (AO)
-        wave_res = WaveCore.check_wave_structure(df)
-        if wave_res['is_wave3']:
+
+        if m['is_wave3']:
             result['score'] += 15
             result['details'].append("Wave: Potential Wave 3")
-        if wave_res['divergence']:
+        if m['divergence']:
              result['score'] -= 20
              result['details'].append("Wave: Bearish Divergence (Risk)")
 
-        # 5. Volume/Trend Filter
-        # MA Alignment
-        ma20 = df['close'].rolling(20).mean().iloc[-1]
-        ma60 = df['close'].rolling(60).mean().iloc[-1]
-        if ma20 > ma60:
+        # MA Alignment (already computed in the fused feature pass)
+        if m['ma20'] > m['ma60']:
              result['score'] += 5
-        
+
         # Final Coarse Filter
         # e.g. Score > 60 implies a good candidate
-        
+
         return result
 
     @staticmethod
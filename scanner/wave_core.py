@@ -1,6 +1,50 @@
 import pandas as pd
 import numpy as np
 
+from ._njit import njit, NUMBA_AVAILABLE, nb_types
+
+if NUMBA_AVAILABLE:
+    # ao/close come from Series.to_numpy() and may be read-only (see _njit)
+    _f8_ro = nb_types.Array(nb_types.float64, 1, 'A', readonly=True)
+    _WAVE_SIG = nb_types.Tuple(
+        (nb_types.boolean, nb_types.boolean, nb_types.boolean,
+         nb_types.float64, nb_types.float64, nb_types.float64))(_f8_ro, _f8_ro)
+else:
+    _WAVE_SIG = None
+
+
+@njit(_WAVE_SIG, cache=True)
+def _wave_scan(ao: np.ndarray, close: np.ndarray):
+    """
+    Single pass over the last 50 bars: AO max/min and close max (NaN-aware,
+    since AO has a 33-bar warm-up), plus the three wave flags.
+    """
+    n = ao.size
+    max_ao = -np.inf
+    min_ao = np.inf
+    max_close = -np.inf
+    for i in range(n - 50, n):
+        a = ao[i]
+        if a == a:  # skip NaN
+            if a > max_ao:
+                max_ao = a
+            if a < min_ao:
+                min_ao = a
+        c = close[i]
+        if c > max_close:
+            max_close = c
+
+    last_ao = ao[n - 1]
+    prev_ao = ao[n - 2]
+
+    zero_cross_up = (prev_ao < 0.0) and (last_ao > 0.0)
+    is_wave3 = (last_ao > 0.0) and (last_ao > max_ao * 0.8)
+    divergence = (close[n - 1] >= max_close * 0.98) and \
+                 (last_ao < max_ao * 0.7) and (last_ao > 0.0)
+
+    return is_wave3, divergence, zero_cross_up, last_ao, max_ao, min_ao
+
+
 class WaveCore:
     """
     Elliott Wave helper based on Awesome Oscillator (AO).
@@ -8,14 +52,27 @@ class WaveCore:
     """
     
     @staticmethod
-    def calculate_ao(df: pd.DataFrame) -> pd.DataFrame:
-        df = df.copy()
-        # Median Price
-        df['mp'] = (df['high'] + df['low']) / 2
-        df['sma5'] = df['mp'].rolling(window=5).mean()
-        df['sma34'] = df['mp'].rolling(window=34).mean()
-        df['ao'] = df['sma5'] - df['sma34']
-        return df
+    def calculate_ao(high: np.ndarray, low: np.ndarray) -> dict:
+        """
+        AO from raw arrays. Returns {'mp', 'sma5', 'sma34', 'ao'} as numpy
+        arrays — no DataFrame copy per symbol, callers attach what they need.
+        """
+        mp = (np.asarray(high, dtype=np.float64) +
+              np.asarray(low, dtype=np.float64)) * 0.5
+
+        # Both SMAs from one prefix-sum pass: rolling mean over window w is
+        # (cs[i] - cs[i-w]) / w. Two pandas .rolling() walks become a single
+        # cumsum plus two vectorized differences.
+        n = mp.size
+        cs = np.concatenate(([0.0], np.cumsum(mp)))
+        sma5 = np.full(n, np.nan)
+        sma34 = np.full(n, np.nan)
+        if n >= 5:
+            sma5[4:] = (cs[5:] - cs[:-5]) / 5.0
+        if n >= 34:
+            sma34[33:] = (cs[34:] - cs[:-34]) / 34.0
+
+        return {'mp': mp, 'sma5': sma5, 'sma34': sma34, 'ao': sma5 - sma34}
 
     @staticmethod
     def check_wave_structure(df: pd.DataFrame) -> dict:
@@ -34,40 +91,54 @@ class WaveCore:
         """
         if len(df) < 50:
             return {'status': 'Unknown', 'desc': 'Not enough data'}
-            
-        if 'ao' not in df.columns:
-            df = WaveCore.calculate_ao(df)
-            
-        # Get last few AO values
-        last_ao = df['ao'].iloc[-1]
-        prev_ao = df['ao'].iloc[-2]
-        
-        # Check for Zero Cross (Transition)
-        zero_cross_up = (prev_ao < 0) and (last_ao > 0)
-        
-        # Find local peaks of AO in recent window (e.g., 50 bars)
-        recent_window = df.iloc[-50:]
-        max_ao = recent_window['ao'].max()
-        min_ao = recent_window['ao'].min()
-        
+
+        # Extract once; every read below is plain ndarray indexing instead
+        # of a pandas .iloc / filtered-window dispatch
+        if 'ao' in df.columns:
+            ao = df['ao'].to_numpy(dtype=np.float64)
+        else:
+            ao = WaveCore.calculate_ao(df['high'].to_numpy(dtype=np.float64),
+                                       df['low'].to_numpy(dtype=np.float64))['ao']
+        close = df['close'].to_numpy(dtype=np.float64)
+
+        if NUMBA_AVAILABLE:
+            # Single fused pass over the 50-bar tail
+            is_wave3, divergence, zero_cross_up, last_ao, max_ao, min_ao = \
+                _wave_scan(ao, close)
+        else:
+            # Get last few AO values
+            last_ao = ao[-1]
+            prev_ao = ao[-2]
+
+            # Check for Zero Cross (Transition)
+            zero_cross_up = (prev_ao < 0) and (last_ao > 0)
+
+            # Find local peaks of AO in recent window (e.g., 50 bars).
+            # nan-aware: AO has a 33-bar warm-up of NaNs.
+            max_ao = np.nanmax(ao[-50:])
+            min_ao = np.nanmin(ao[-50:])
+
+            # 1. Potential Wave 3 (Strong Momentum)
+            # If current AO is very positive and close to recent Max.
+            is_wave3 = (last_ao > 0) and (last_ao > max_ao * 0.8)
+
+            # 2. Divergence (Potential Wave 5 Top)
+            # Price High > Prev Price High, but AO High < Prev AO High
+            # Need peak detection logic. Simplified:
+            # Just check if Price is Max in window, but AO is NOT Max in window.
+            price_max = close[-50:].max()
+            curr_price = close[-1]
+            divergence = (curr_price >= price_max * 0.98) and \
+                         (last_ao < max_ao * 0.7) and (last_ao > 0)
+
         res = {'status': 'Neutral', 'desc': '', 'is_wave3': False, 'divergence': False}
-        
-        # 1. Potential Wave 3 (Strong Momentum)
-        # If current AO is very positive and close to recent Max.
-        if last_ao > 0 and last_ao > (max_ao * 0.8):
+
+        if is_wave3:
             res['status'] = 'Bullish'
             res['is_wave3'] = True
             res['desc'] += "Strong AO Momentum (Potential Wave 3). "
-            
-        # 2. Divergence (Potential Wave 5 Top)
-        # Price High > Prev Price High, but AO High < Prev AO High
-        # Need peak detection logic. Simplified:
-        # Just check if Price is Max in window, but AO is NOT Max in window.
-        
-        price_max = recent_window['close'].max()
-        curr_price = df['close'].iloc[-1]
-        
-        if (curr_price >= price_max * 0.98) and (last_ao < max_ao * 0.7) and (last_ao > 0):
+
+        if divergence:
              res['divergence'] = True
              res['desc'] += "Bearish Divergence (Price High but AO Weak). "
 
@@ -0,0 +1,58 @@
+"""
+End-to-end smoke test for the daily pipeline.
+
+Runs with or without numba installed; with numba it exercises the
+eagerly compiled kernels, including the read-only arrays that
+Series.to_numpy() returns under pandas copy-on-write.
+"""
+import numpy as np
+import pandas as pd
+
+from scanner.strategy import Strategy
+
+
+def _daily_df(n=700, seed=7):
+    rng = np.random.default_rng(seed)
+    close = 10 + np.cumsum(rng.normal(0, 0.1, n))
+    dates = pd.date_range('2023-01-02', periods=n, freq='B').astype(str)
+    return pd.DataFrame({
+        'date': dates,
+        'open': close,
+        'high': close + rng.uniform(0.01, 0.3, n),
+        'low': close - rng.uniform(0.01, 0.3, n),
+        'close': close,
+        'volume': rng.uniform(1e5, 1e6, n),
+        'turnover': rng.uniform(0.5, 5.0, n),
+    })
+
+
+def test_analyze_daily_end_to_end():
+    res = Strategy.analyze_daily(_daily_df())
+    assert 'score' in res
+    assert 'details' in res
+    assert isinstance(res['score'], (int, float, np.floating))
+
+
+def test_kernels_accept_readonly_arrays():
+    from scanner.micro_structure import _ofi_sum, _tick_sign_ffill
+    from scanner.rsrs_core import _rsrs_rolling
+    from scanner.wave_core import _wave_scan
+
+    rng = np.random.default_rng(0)
+    n = 100
+    highs = 10 + rng.random(n)
+    lows = highs - 0.5
+    ao = np.full(n, np.nan)
+    ao[33:] = rng.normal(0, 1, n - 33)
+    price = 10 + np.round(rng.random(n), 2)
+    qty = rng.uniform(100, 1000, n)
+    for a in (highs, lows, ao, price, qty):
+        a.setflags(write=False)
+
+    betas, r2s = _rsrs_rolling(highs, lows, 18)
+    assert betas.size == n - 18 + 1
+
+    _wave_scan(ao, highs)
+    _ofi_sum(price, qty, price, qty)
+    signs = _tick_sign_ffill(price)
+    assert signs.dtype == np.int8
@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+
+from scanner.chan_core import ChanCore
+
+
+def _daily_df(n=120, seed=3):
+    rng = np.random.default_rng(seed)
+    close = 10 + np.cumsum(rng.normal(0, 0.2, n))
+    dates = pd.date_range('2024-01-02', periods=n, freq='B').strftime('%Y-%m-%d')
+    return pd.DataFrame({
+        'date': dates,
+        'high': close + rng.uniform(0.01, 0.5, n),
+        'low': close - rng.uniform(0.01, 0.5, n),
+        'close': close,
+    })
+
+
+def test_incremental_cache_is_loadable_and_reused(tmp_path, monkeypatch):
+    df = _daily_df()
+    cache_dir = str(tmp_path)
+
+    first = ChanCore.find_fractals_incremental(df, 'sh.600000', cache_dir=cache_dir)
+
+    # The entry must be readable without pickling (np.load default)
+    cached = np.load(tmp_path / 'sh_600000.npz')
+    assert cached['dates'].dtype.kind == 'U'
+    assert np.array_equal(cached['types'], first['type'].to_numpy())
+
+    # Second scan must only re-classify the tail, not the whole window
+    seen = []
+    orig = ChanCore._fractal_types
+
+    def spy(highs, lows):
+        seen.append(len(highs))
+        return orig(highs, lows)
+
+    monkeypatch.setattr(ChanCore, '_fractal_types', staticmethod(spy))
+    second = ChanCore.find_fractals_incremental(df, 'sh.600000', cache_dir=cache_dir)
+    assert seen == [ChanCore._TAIL_RECHECK]
+    assert np.array_equal(first['type'].to_numpy(), second['type'].to_numpy())
@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+
+from scanner.chan_core import ChanCore
+
+
+def _rand_df(n, seed):
+    rng = np.random.default_rng(seed)
+    close = 10 + np.cumsum(rng.normal(0, 0.2, n))
+    dates = pd.date_range('2022-01-03', periods=n, freq='B').astype(str)
+    return pd.DataFrame({
+        'date': dates,
+        'high': close + rng.uniform(0.01, 0.5, n),
+        'low': close - rng.uniform(0.01, 0.5, n),
+        'close': close,
+    })
+
+
+def test_get_last_k_bi_matches_full_list_tail():
+    for seed in range(50):
+        df = _rand_df(700, seed)
+        full = ChanCore.get_bi_list(df)
+        for k in (3, 4):
+            assert ChanCore.get_last_k_bi(df, k=k) == full[-k:]
+
+
+def test_get_last_k_bi_agrees_with_check_buys():
+    # The tail scan must feed check_buys the same structure as the full list
+    for seed in range(50):
+        df = _rand_df(700, seed)
+        price = float(df['close'].iloc[-1])
+        expected = ChanCore.check_buys(ChanCore.get_bi_list(df)[-4:], price)
+        got = ChanCore.check_buys(ChanCore.get_last_k_bi(df, k=4), price)
+        assert got == expected